@@ -0,0 +1,3 @@
+from __future__ import annotations
+
+__all__ = []
\ No newline at end of file
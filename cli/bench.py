@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import os
+import sys
+import time
+import random
+import platform
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PIL import ImageFont, __version__ as _PIL_VERSION
+
+from ..types.config import PngOptions
+from ..types.models import GenerationStats
+from ..core.export import saveBitmapsOnly, writeIni
+from ..core.fonts import getFontCmapCodepoints
+from ..core.memory import peakRssBytes
+from ..core.pages import buildGlyphTable, composePage, planPages
+
+
+_SYNTHETIC_FORMAT = 1
+
+SYNTHETIC_FONTS: Dict[str, Tuple[int, int, Tuple[int, int], Tuple[Tuple[int, int], ...]]] = {
+    "latin": (190, 600, (1, 3), ((0x20, 0x7F), (0xA1, 0x100))),
+    "mixed": (3000, 700, (2, 5), ((0x20, 0x7F), (0xA1, 0x530), (0x3041, 0x3097), (0x4E00, 0xA000))),
+    "cjk": (30000, 1000, (4, 10), ((0x4E00, 0xA000), (0xAC00, 0xD7A4))),
+}
+
+STAGES = ("cmap", "rasterize", "bounds", "plan", "compose", "png", "ini")
+
+
+def _syntheticCodepoints(count: int, ranges: Tuple[Tuple[int, int], ...]) -> List[int]:
+    cps: List[int] = []
+    for start, stop in ranges:
+        for cp in range(start, stop):
+            if len(cps) >= count:
+                return cps
+            cps.append(cp)
+    return cps
+
+
+def buildSyntheticFont(path: str, name: str) -> str:
+    from fontTools.fontBuilder import FontBuilder
+    from fontTools.pens.ttGlyphPen import TTGlyphPen
+
+    count, advance, (lo, hi), ranges = SYNTHETIC_FONTS[name]
+    glyph_order = [".notdef"]
+    cmap: Dict[int, str] = {}
+    glyphs = {}
+    metrics: Dict[str, Tuple[int, int]] = {}
+    pen = TTGlyphPen(None)
+    pen.moveTo((50, 0))
+    pen.lineTo((50, 700))
+    pen.lineTo((advance - 50, 700))
+    pen.lineTo((advance - 50, 0))
+    pen.closePath()
+    glyphs[".notdef"] = pen.glyph()
+    metrics[".notdef"] = (advance, 50)
+    for cp in _syntheticCodepoints(count, ranges):
+        glyph_name = f"uni{cp:04X}"
+        glyph_order.append(glyph_name)
+        cmap[cp] = glyph_name
+        pen = TTGlyphPen(None)
+        if cp == 0x20:
+            glyphs[glyph_name] = pen.glyph()
+            metrics[glyph_name] = (advance // 2, 0)
+            continue
+        rng = random.Random(cp)
+        x_min = advance
+        for _ in range(rng.randint(lo, hi)):
+            w = rng.randint(advance // 12, advance // 3)
+            h = rng.randint(60, 400)
+            x = rng.randint(advance // 20, advance - advance // 20 - w)
+            y = rng.randint(-120, 760 - h)
+            pen.moveTo((x, y))
+            pen.lineTo((x, y + h))
+            pen.lineTo((x + w, y + h))
+            pen.lineTo((x + w, y))
+            pen.closePath()
+            x_min = min(x_min, x)
+        glyphs[glyph_name] = pen.glyph()
+        metrics[glyph_name] = (advance, x_min)
+    fb = FontBuilder(1000, isTTF=True)
+    fb.setupGlyphOrder(glyph_order)
+    fb.setupCharacterMap(cmap)
+    fb.setupGlyf(glyphs)
+    fb.setupHorizontalMetrics(metrics)
+    fb.setupHorizontalHeader(ascent=880, descent=-120)
+    fb.setupNameTable({"familyName": f"TFF Bench {name.title()}", "styleName": "Regular"})
+    fb.setupOS2(sTypoAscender=880, sTypoDescender=-120, sTypoLineGap=0, usWinAscent=880, usWinDescent=120)
+    fb.setupPost()
+    fb.save(path)
+    return path
+
+
+def syntheticFontPath(work_dir: str, name: str) -> str:
+    path = os.path.join(work_dir, f"bench-{name}-v{_SYNTHETIC_FORMAT}.ttf")
+    if not os.path.exists(path):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        buildSyntheticFont(tmp_path, name)
+        os.replace(tmp_path, path)
+    return path
+
+
+def _benchOnce(font_path: str, size_px: int, padding: int, workers: int, out_dir: str, png_options: Optional[PngOptions]) -> Tuple[Dict[str, float], int, int]:
+    times: Dict[str, float] = {}
+    t = time.perf_counter()
+    cps = getFontCmapCodepoints(font_path)
+    times["cmap"] = time.perf_counter() - t
+    t = time.perf_counter()
+    table = buildGlyphTable(font_path, size_px, cps, workers=workers)
+    times["rasterize"] = time.perf_counter() - t
+    stats = GenerationStats()
+    t = time.perf_counter()
+    metrics, plan = planPages(font_path, size_px, padding, out_dir, group_name="bench", codepoints=cps, glyph_table=table, stats=stats)
+    times["bounds"] = stats.stage_seconds.get("bounds", 0.0)
+    times["plan"] = time.perf_counter() - t - times["bounds"]
+    t = time.perf_counter()
+    pages = [composePage(plan, i) for i in range(len(plan.batches))]
+    times["compose"] = time.perf_counter() - t
+    base_path = os.path.join(out_dir, f"bench {size_px}px")
+    t = time.perf_counter()
+    saveBitmapsOnly(base_path, pages, png_options=png_options)
+    times["png"] = time.perf_counter() - t
+    t = time.perf_counter()
+    writeIni(f"{base_path}.ini", metrics, pages)
+    times["ini"] = time.perf_counter() - t
+    return times, len(cps), len(pages)
+
+
+def benchFont(
+    font_path: str,
+    size_px: int = 32,
+    padding: int = 2,
+    workers: int = 1,
+    repeat: int = 1,
+    png_options: Optional[PngOptions] = None,
+) -> dict:
+    best: Dict[str, float] = {}
+    glyphs = pages = 0
+    with tempfile.TemporaryDirectory(prefix="tff-bench-") as out_dir:
+        for run in range(max(1, int(repeat))):
+            times, glyphs, pages = _benchOnce(font_path, size_px, padding, workers, out_dir, png_options)
+            for stage, seconds in times.items():
+                if stage == "cmap" and run:
+                    continue
+                best[stage] = min(seconds, best.get(stage, seconds))
+    total = sum(best.values())
+    peak = peakRssBytes()
+    return {
+        "font": font_path,
+        "size_px": size_px,
+        "glyphs": glyphs,
+        "pages": pages,
+        "stages": {stage: round(best[stage], 6) for stage in STAGES},
+        "total_seconds": round(total, 6),
+        "glyphs_per_sec": round(glyphs / total, 1) if total > 0 else None,
+        "rasterize_glyphs_per_sec": round(glyphs / best["rasterize"], 1) if best["rasterize"] > 0 else None,
+        "peak_rss_mb": round(peak / (1024 * 1024), 1) if peak else None,
+    }
+
+
+def runBenchmarks(
+    names: List[str],
+    work_dir: Optional[str] = None,
+    size_px: int = 32,
+    padding: int = 2,
+    workers: int = 1,
+    repeat: int = 1,
+    png_options: Optional[PngOptions] = None,
+    progress: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    work_dir = work_dir or os.path.join(tempfile.gettempdir(), "texture_font_factory-bench")
+    os.makedirs(work_dir, exist_ok=True)
+    results: List[dict] = []
+    t0 = time.perf_counter()
+    for name in names:
+        font_path = syntheticFontPath(work_dir, name) if name in SYNTHETIC_FONTS else name
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            result = pool.submit(benchFont, font_path, size_px, padding, workers, repeat, png_options).result()
+        result["name"] = name
+        results.append(result)
+        if progress:
+            progress(result)
+    return {
+        "python": platform.python_version(),
+        "platform": sys.platform,
+        "pillow": _PIL_VERSION,
+        "freetype": getattr(getattr(ImageFont, "core", None), "freetype2_version", None),
+        "cpu_count": os.cpu_count(),
+        "workers": workers,
+        "repeat": repeat,
+        "results": results,
+        "wall_seconds": round(time.perf_counter() - t0, 3),
+    }
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+from dataclasses import asdict
+from typing import Dict, List, Optional
+
+from ..types.config import GenerateConfig, PngOptions
+from ..types.models import BatchResult
+from ..core.batch import loadManifest, runBatch
+from ..core.export import REDIR_KEYS
+from ..core.profiling import PROFILE_MODES
+from .bench import SYNTHETIC_FONTS, runBenchmarks
+from ..core.paths import userCacheDir
+
+
+def _parseRedir(values: List[str], double_res: bool) -> Dict[str, str]:
+    modes = {k: "default" for k in REDIR_KEYS}
+    if double_res:
+        modes["Common Large"] = "2x"
+    for item in values:
+        if "=" not in item:
+            raise ValueError(f"redir must be KEY=MODE: {item}")
+        key, mode = (part.strip() for part in item.split("=", 1))
+        match = next((k for k in REDIR_KEYS if k.lower() == key.lower()), None)
+        if match is None:
+            raise ValueError(f"unknown redir key: {key}")
+        if mode.lower() not in ("default", "2x"):
+            raise ValueError(f"redir mode must be default or 2x: {mode}")
+        modes[match] = mode.lower()
+    return modes
+
+
+def _buildConfigs(args: argparse.Namespace) -> List[GenerateConfig]:
+    redir_modes = _parseRedir(args.redir or [], args.double_res)
+    png_options = PngOptions(compress_level=args.compress_level, strategy=args.png_strategy, optimize=args.optimize, workers=args.png_workers)
+    configs: List[GenerateConfig] = []
+    for font_path in args.fonts:
+        for size_px in args.size:
+            configs.append(GenerateConfig(
+                font_path=font_path,
+                size_px=size_px,
+                padding=args.padding,
+                save_dir=args.out,
+                group_name=f"_{args.name} {size_px}px" if args.name else "main",
+                vertical=args.vertical,
+                max_chars_per_page=args.max_chars_per_page,
+                preset=args.preset,
+                center_offset=args.center_offset,
+                top_offset=args.top_offset,
+                baseline_offset=args.baseline_offset,
+                left_overlap=args.left_overlap,
+                right_overlap=args.right_overlap,
+                advance_extra=args.advance_extra,
+                workers=args.workers,
+                export_stroke_templates=args.stroke_templates,
+                write_redir_files=not args.no_redir_files,
+                redir_modes=redir_modes,
+                page_mode=args.page_mode,
+                png_options=png_options,
+                incremental=not args.full,
+                profile=args.profile,
+                max_memory_mb=args.max_memory,
+            ))
+    return configs
+
+
+def _printResult(result: BatchResult) -> None:
+    if result.error:
+        print(f"failed {result.base_path}: {result.error}", file=sys.stderr, flush=True)
+    elif result.duplicate_of is not None:
+        print(f"dup {result.ini_path} (same as job {result.duplicate_of})", flush=True)
+    else:
+        print(f"ok {result.ini_path} ({result.seconds:.2f}s)", flush=True)
+
+
+def _writeReport(path: str, results: List[BatchResult]) -> None:
+    report = []
+    for i, result in enumerate(results):
+        config = asdict(result.config)
+        config.pop("progress_cb", None)
+        config.pop("should_cancel", None)
+        report.append({
+            "job": i,
+            "base_path": result.base_path,
+            "ini_path": result.ini_path,
+            "seconds": round(result.seconds, 3),
+            "error": result.error,
+            "duplicate_of": result.duplicate_of,
+            "stats": asdict(result.stats) if result.stats is not None else None,
+            "config": config,
+        })
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def runConfigs(configs: List[GenerateConfig], jobs: int = 1, cache_dir: Optional[str] = None, report: Optional[str] = None) -> int:
+    results = runBatch(configs, jobs=jobs, cache_dir=cache_dir, on_result=_printResult)
+    if report:
+        _writeReport(report, results)
+    return sum(1 for result in results if result.error)
+
+
+def _addBuildArguments(p: argparse.ArgumentParser) -> None:
+    p.add_argument("fonts", nargs="+", help="font files; use 'path|index=N' for a face of a .ttc")
+    p.add_argument("-o", "--out", required=True, help="output folder")
+    p.add_argument("-s", "--size", type=int, action="append", required=True, help="size in px (repeatable)")
+    p.add_argument("-p", "--padding", type=int, default=2)
+    p.add_argument("--name", help="base file name instead of the font family")
+    p.add_argument("--preset", choices=("numbers", "plane2"))
+    p.add_argument("--vertical", action="store_true")
+    p.add_argument("--max-chars-per-page", type=int)
+    p.add_argument("--center-offset", type=int, default=0)
+    p.add_argument("--top-offset", type=int, default=0)
+    p.add_argument("--baseline-offset", type=int, default=0)
+    p.add_argument("--left-overlap", type=int, default=0)
+    p.add_argument("--right-overlap", type=int, default=0)
+    p.add_argument("--advance-extra", type=int, default=0)
+    p.add_argument("--stroke-templates", action="store_true", help="also export stroke template pages")
+    p.add_argument("--redir", action="append", metavar="KEY=MODE", help="redir mode, e.g. 'Common Large=2x' (repeatable)")
+    p.add_argument("--double-res", action="store_true", help="shorthand for --redir 'Common Large=2x'")
+    p.add_argument("--no-redir-files", action="store_true", help="do not write .redir files (they are shared by every build in the output folder)")
+    p.add_argument("--page-mode", choices=("RGBA", "LA"), default="RGBA")
+    p.add_argument("--compress-level", type=int, choices=range(10), metavar="0-9")
+    p.add_argument("--png-strategy", choices=("default", "filtered", "huffman", "rle", "fixed"))
+    p.add_argument("--optimize", action="store_true", help="let zlib search for the smallest PNG")
+    p.add_argument("--png-workers", type=int, default=0, help="PNG encoder threads per job (0 = auto)")
+    p.add_argument("--full", action="store_true", help="rewrite every page even if its inputs are unchanged")
+    p.add_argument("-w", "--workers", type=int, default=1, help="glyph rasterizer processes per job")
+    p.add_argument("--max-memory", type=float, metavar="MB", help="memory budget per job; fails early with an estimate if it cannot fit")
+    p.add_argument("--profile", nargs="?", const="all", choices=PROFILE_MODES, help="write pstats and/or collapsed-stack profiles next to the output (default: all)")
+    _addSchedulerArguments(p)
+
+
+def _addSchedulerArguments(p: argparse.ArgumentParser) -> None:
+    p.add_argument("-j", "--jobs", type=int, default=1, help="fonts/sizes built concurrently")
+    p.add_argument("--cache-dir", default=userCacheDir("glyphs"), help="glyph cache folder")
+    p.add_argument("--no-cache", action="store_true", help="disable the on-disk glyph cache")
+    p.add_argument("--report", metavar="JSON", help="write per-job results and timings to this file")
+
+
+def _addBatchArguments(p: argparse.ArgumentParser) -> None:
+    p.add_argument("manifest", help="JSON or TOML file listing the builds")
+    _addSchedulerArguments(p)
+
+
+def _addBenchArguments(p: argparse.ArgumentParser) -> None:
+    p.add_argument("fonts", nargs="*", help=f"synthetic font names ({', '.join(SYNTHETIC_FONTS)}) or font files; default: all synthetic fonts")
+    p.add_argument("-s", "--size", type=int, default=32)
+    p.add_argument("-p", "--padding", type=int, default=2)
+    p.add_argument("-w", "--workers", type=int, default=1, help="glyph rasterizer processes")
+    p.add_argument("--repeat", type=int, default=1, help="runs per font; the fastest time of each stage is reported")
+    p.add_argument("--compress-level", type=int, choices=range(10), metavar="0-9")
+    p.add_argument("--work-dir", help="folder for the generated synthetic fonts")
+    p.add_argument("-o", "--output", help="write the JSON report here instead of stdout")
+
+
+def _runBench(args: argparse.Namespace) -> int:
+    png_options = PngOptions(compress_level=args.compress_level) if args.compress_level is not None else None
+
+    def _progress(result: dict) -> None:
+        print(f"{result['name']}: {result['glyphs']} glyphs, {result['total_seconds']:.2f}s, {result['glyphs_per_sec']} glyphs/s", file=sys.stderr, flush=True)
+
+    report = runBenchmarks(
+        args.fonts or list(SYNTHETIC_FONTS), work_dir=args.work_dir, size_px=args.size, padding=args.padding,
+        workers=args.workers, repeat=args.repeat, png_options=png_options, progress=_progress,
+    )
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+def buildParser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="texture_font_factory", description="Headless texture font builder.")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    sub = parser.add_subparsers(dest="command", required=True)
+    _addBuildArguments(sub.add_parser("build", help="generate texture pages and ini files"))
+    _addBatchArguments(sub.add_parser("batch", help="run every build listed in a manifest"))
+    _addBenchArguments(sub.add_parser("bench", help="time each export stage on synthetic fonts"))
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = buildParser()
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+    logging.getLogger("fontTools").setLevel(logging.ERROR)
+    if args.command == "bench":
+        return _runBench(args)
+    try:
+        configs = _buildConfigs(args) if args.command == "build" else loadManifest(args.manifest)
+    except (OSError, ValueError, RuntimeError) as e:
+        parser.error(str(e))
+    cache_dir = None if args.no_cache else args.cache_dir
+    try:
+        return 1 if runConfigs(configs, args.jobs, cache_dir, args.report) else 0
+    except ValueError as e:
+        parser.error(str(e))
+    return 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+import logging
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, fields, replace
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..types.config import GenerateConfig, PngOptions
+from ..types.models import BatchResult, GenerationStats
+from .export import generateAndSave, outputBasePaths, writeRedirFiles
+from .fonts import fontDisplayName
+from .cache import GlyphCache
+from .paths import splitFontPath
+
+try:
+    import tomllib
+except Exception:
+    tomllib = None
+
+
+logger = logging.getLogger(__name__)
+
+_CONFIG_FIELDS = {f.name for f in fields(GenerateConfig)} - {"progress_cb", "should_cancel"}
+
+_batch_cache: Optional[GlyphCache] = None
+
+
+def configBasePath(config: GenerateConfig) -> str:
+    if config.group_name and config.group_name != "main":
+        return os.path.join(config.save_dir, config.group_name)
+    return os.path.join(config.save_dir, f"_{_sanitizeName(fontDisplayName(config.font_path))} {config.size_px}px")
+
+
+def _sanitizeName(s: str) -> str:
+    return "".join(c if c not in '<>:"/\\|?*' else " " for c in s).strip()
+
+
+def generateFromConfig(
+    config: GenerateConfig,
+    glyph_cache: Optional[GlyphCache] = None,
+    stats: Optional[GenerationStats] = None,
+    defer_redir_files: bool = False,
+) -> str:
+    if config.fixed_cols or config.fixed_rows:
+        raise ValueError("fixed_cols/fixed_rows are not supported for exports")
+    return generateAndSave(
+        font_path=config.font_path,
+        size_px=config.size_px,
+        padding=config.padding,
+        base_path=configBasePath(config),
+        vertical=config.vertical,
+        max_chars_per_page=config.max_chars_per_page,
+        export_stroke_templates=config.export_stroke_templates,
+        preset=config.preset,
+        write_redir_files=config.write_redir_files,
+        redir_modes=config.redir_modes,
+        center_offset=config.center_offset,
+        top_offset=config.top_offset,
+        baseline_offset=config.baseline_offset,
+        left_overlap=config.left_overlap,
+        right_overlap=config.right_overlap,
+        advance_extra=config.advance_extra,
+        glyph_cache=glyph_cache,
+        workers=config.workers,
+        page_mode=config.page_mode,
+        png_options=config.png_options,
+        codepoints=config.codepoints,
+        max_texture_size=config.max_texture_size,
+        progress_cb=config.progress_cb,
+        should_cancel=config.should_cancel,
+        incremental=config.incremental,
+        stats=stats,
+        profile=config.profile,
+        max_memory_mb=config.max_memory_mb,
+        defer_redir_files=defer_redir_files,
+    )
+
+
+def _configFromEntry(entry: dict, base_dir: str) -> List[GenerateConfig]:
+    unknown = set(entry) - _CONFIG_FIELDS
+    if unknown:
+        raise ValueError(f"unknown manifest keys: {', '.join(sorted(unknown))}")
+    entry = dict(entry)
+    if isinstance(entry.get("save_dir"), str):
+        entry["save_dir"] = os.path.normpath(os.path.join(base_dir, os.path.expanduser(entry["save_dir"])))
+    png = entry.get("png_options")
+    if isinstance(png, dict):
+        entry["png_options"] = PngOptions(**png)
+    fonts = entry.pop("font_path", None)
+    sizes = entry.pop("size_px", None)
+    if fonts is None or sizes is None or "padding" not in entry or "save_dir" not in entry:
+        raise ValueError("manifest entries need font_path, size_px, padding and save_dir")
+    fonts = fonts if isinstance(fonts, list) else [fonts]
+    sizes = sizes if isinstance(sizes, list) else [sizes]
+    configs: List[GenerateConfig] = []
+    for font_path in fonts:
+        if not isinstance(font_path, str):
+            raise ValueError(f"font_path must be a string: {font_path!r}")
+        path, index = splitFontPath(font_path)
+        path = os.path.normpath(os.path.join(base_dir, os.path.expanduser(path)))
+        font_path = path if index is None else f"{path}|index={index}"
+        for size_px in sizes:
+            configs.append(GenerateConfig(font_path=font_path, size_px=int(size_px), **entry))
+    return configs
+
+
+def loadManifest(path: str) -> List[GenerateConfig]:
+    if path.lower().endswith(".toml"):
+        if tomllib is None:
+            raise RuntimeError("TOML manifests need Python 3.11+; use JSON instead")
+        with open(path, "rb") as f:
+            data = tomllib.load(f)
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    if isinstance(data, list):
+        defaults: dict = {}
+        entries = data
+    elif isinstance(data, dict):
+        defaults = data.get("defaults") or {}
+        entries = data.get("jobs") or []
+    else:
+        raise ValueError("manifest must be a list of jobs or a table with 'jobs'")
+    base_dir = os.path.dirname(os.path.abspath(path))
+    configs: List[GenerateConfig] = []
+    for entry in entries:
+        if not isinstance(entry, dict):
+            raise ValueError(f"manifest job must be a table: {entry!r}")
+        configs.extend(_configFromEntry({**defaults, **entry}, base_dir))
+    return configs
+
+
+def _configKey(config: GenerateConfig) -> str:
+    data = asdict(replace(config, progress_cb=None, should_cancel=None))
+    return json.dumps(data, sort_keys=True, default=str)
+
+
+def _groupKey(config: GenerateConfig) -> Tuple[str, int]:
+    path, index = splitFontPath(config.font_path)
+    return os.path.normcase(os.path.abspath(path)) + f"|{index or 0}", int(config.size_px)
+
+
+def _pathKey(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _initBatchWorker(cache_dir: Optional[str]) -> None:
+    global _batch_cache
+    _batch_cache = GlyphCache(cache_dir=cache_dir)
+
+
+def _runBatchGroup(
+    group: List[Tuple[int, GenerateConfig]],
+    glyph_cache: Optional[GlyphCache] = None,
+) -> List[Tuple[int, Optional[str], float, Optional[str], GenerationStats]]:
+    glyph_cache = glyph_cache if glyph_cache is not None else _batch_cache
+    out: List[Tuple[int, Optional[str], float, Optional[str], GenerationStats]] = []
+    for index, config in group:
+        t0 = time.perf_counter()
+        stats = GenerationStats()
+        try:
+            ini_path = generateFromConfig(config, glyph_cache=glyph_cache, stats=stats, defer_redir_files=True)
+            out.append((index, ini_path, time.perf_counter() - t0, None, stats))
+        except Exception as e:
+            logger.warning(f"batch: job {index} failed: {e}")
+            out.append((index, None, time.perf_counter() - t0, str(e) or e.__class__.__name__, stats))
+    if glyph_cache is not None:
+        glyph_cache.flush()
+    return out
+
+
+def runBatch(
+    configs: List[GenerateConfig],
+    jobs: int = 1,
+    cache_dir: Optional[str] = None,
+    on_result: Optional[Callable[[BatchResult], None]] = None,
+) -> List[BatchResult]:
+    results = [BatchResult(config=config, base_path=configBasePath(config)) for config in configs]
+    first: Dict[str, int] = {}
+    owners: Dict[str, int] = {}
+    groups: "OrderedDict[Tuple[str, int], List[Tuple[int, GenerateConfig]]]" = OrderedDict()
+    for i, result in enumerate(results):
+        key = _configKey(result.config)
+        if key in first:
+            result.duplicate_of = first[key]
+            continue
+        first[key] = i
+        config = result.config
+        for path in outputBasePaths(result.base_path, config.size_px, config.write_redir_files, config.redir_modes):
+            if _pathKey(path) in owners:
+                raise ValueError(f"jobs {owners[_pathKey(path)]} and {i} both write {path}")
+            owners[_pathKey(path)] = i
+        if jobs > 1:
+            config = replace(config, progress_cb=None, should_cancel=None)
+        groups.setdefault(_groupKey(config), []).append((i, config))
+    logger.info(f"batch: {len(configs)} jobs, {len(first)} unique, {len(groups)} font/size groups")
+
+    def _collect(done: List[Tuple[int, Optional[str], float, Optional[str], GenerationStats]]) -> None:
+        for index, ini_path, seconds, error, stats in done:
+            result = results[index]
+            result.ini_path = ini_path
+            result.seconds = seconds
+            result.error = error
+            result.stats = stats
+            if on_result:
+                on_result(result)
+    if jobs <= 1 or len(groups) <= 1:
+        glyph_cache = GlyphCache(cache_dir=cache_dir)
+        try:
+            for group in groups.values():
+                _collect(_runBatchGroup(group, glyph_cache))
+        finally:
+            glyph_cache.close()
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(groups)), initializer=_initBatchWorker, initargs=(cache_dir,)) as pool:
+            futures = [pool.submit(_runBatchGroup, group) for group in groups.values()]
+            for fut in as_completed(futures):
+                _collect(fut.result())
+    redir_owners: Dict[str, int] = {}
+    for i in first.values():
+        result = results[i]
+        if result.config.write_redir_files and result.error is None:
+            redir_owners[_pathKey(os.path.dirname(result.base_path) or ".")] = i
+    for i in redir_owners.values():
+        result = results[i]
+        writeRedirFiles(result.base_path, result.config.size_px, result.config.redir_modes)
+    for result in results:
+        if result.duplicate_of is not None:
+            source = results[result.duplicate_of]
+            result.ini_path = source.ini_path
+            result.error = source.error
+            if on_result:
+                on_result(result)
+    return results
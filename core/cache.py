@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import os
+import time
+import sqlite3
+import threading
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+from PIL import Image
+
+from ..types.models import CharBitmap
+from .glyphs import RENDERER_VERSION
+
+
+logger = logging.getLogger(__name__)
+
+FontKey = Tuple[str, int, int, int]
+GlyphKey = Tuple[FontKey, int, int]
+
+_DISK_FORMAT = 4
+
+
+def _fontKeyText(font_key: FontKey) -> str:
+    path, index, size, mtime = font_key
+    return f"{RENDERER_VERSION}|{path}|{index}|{size}|{mtime}"
+
+
+def _fontPathText(font_key: FontKey) -> str:
+    return f"{font_key[0]}|{font_key[1]}"
+
+
+def _charBitmapBytes(cb: CharBitmap) -> int:
+    w, h = cb.mask.size
+    return w * h * len(cb.mask.getbands()) + 128
+
+
+def _removeOldStores(cache_dir: str, current: str) -> None:
+    for name in os.listdir(cache_dir):
+        if name.startswith("glyphs-v") and name.endswith(".sqlite") and name != current:
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except OSError:
+                pass
+
+
+class GlyphCache:
+    def __init__(
+        self,
+        max_bytes: int = 256 * 1024 * 1024,
+        cache_dir: Optional[str] = None,
+        flush_every: int = 512,
+        max_disk_bytes: int = 1024 * 1024 * 1024,
+    ):
+        self.max_bytes = int(max(0, max_bytes))
+        self.max_disk_bytes = int(max(0, max_disk_bytes))
+        self.cache_dir = cache_dir
+        self.flush_every = max(1, int(flush_every))
+        self._entries: "OrderedDict[GlyphKey, CharBitmap]" = OrderedDict()
+        self._sizes: Dict[GlyphKey, int] = {}
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._loaded: Set[Tuple[FontKey, int]] = set()
+        self._pending: List[tuple] = []
+        self._pruned: Set[str] = set()
+        self.hits = 0
+        self.misses = 0
+        if cache_dir:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                db_name = f"glyphs-v{_DISK_FORMAT}.sqlite"
+                _removeOldStores(cache_dir, db_name)
+                self._db = sqlite3.connect(os.path.join(cache_dir, db_name), timeout=30.0, check_same_thread=False)
+                self._db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS glyphs ("
+                    "font TEXT NOT NULL, size INTEGER NOT NULL, cp INTEGER NOT NULL, "
+                    "width_adv INTEGER NOT NULL, bbox_w INTEGER NOT NULL, bbox_h INTEGER NOT NULL, "
+                    "ink_w INTEGER NOT NULL, ink_h INTEGER NOT NULL, offset_x INTEGER NOT NULL, offset_y INTEGER NOT NULL, "
+                    "mode TEXT NOT NULL, img_w INTEGER NOT NULL, img_h INTEGER NOT NULL, data BLOB NOT NULL, "
+                    "path TEXT NOT NULL, used INTEGER NOT NULL, "
+                    "PRIMARY KEY (font, size, cp))"
+                )
+                self._db.execute("CREATE INDEX IF NOT EXISTS glyphs_path ON glyphs (path)")
+                self._db.commit()
+                self._trimDisk()
+            except Exception as e:
+                logger.warning(f"glyph cache: disk store disabled ({e})")
+                self._db = None
+
+    @property
+    def current_bytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: GlyphKey) -> Optional[CharBitmap]:
+        with self._lock:
+            cb = self._entries.get(key)
+            if cb is None and self._db is not None:
+                self._loadFromDisk(key[0], key[1])
+                cb = self._entries.get(key)
+            if cb is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return cb
+
+    def put(self, key: GlyphKey, cb: CharBitmap, persist: bool = True) -> None:
+        with self._lock:
+            self._store(key, cb)
+            if persist and self._db is not None:
+                self._pending.append(self._row(key, cb))
+                if len(self._pending) >= self.flush_every:
+                    self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._db is None or not self._pending:
+                self._pending = []
+                return
+            try:
+                for font_text, path_text in {(row[0], row[14]) for row in self._pending}:
+                    if font_text not in self._pruned:
+                        self._pruned.add(font_text)
+                        self._db.execute("DELETE FROM glyphs WHERE path = ? AND font != ?", (path_text, font_text))
+                self._db.executemany("INSERT OR REPLACE INTO glyphs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", self._pending)
+                self._db.commit()
+            except Exception as e:
+                logger.warning(f"glyph cache: flush failed ({e})")
+            self._pending = []
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+            self._loaded.clear()
+
+    def close(self) -> None:
+        with self._lock:
+            self.flush()
+            if self._db is not None:
+                self._trimDisk()
+                try:
+                    self._db.close()
+                except Exception:
+                    pass
+                self._db = None
+
+    def _store(self, key: GlyphKey, cb: CharBitmap) -> None:
+        nbytes = _charBitmapBytes(cb)
+        if nbytes > self.max_bytes:
+            return
+        old = self._sizes.pop(key, None)
+        if old is not None:
+            self._bytes -= old
+        self._entries[key] = cb
+        self._entries.move_to_end(key)
+        self._sizes[key] = nbytes
+        self._bytes += nbytes
+        while self._bytes > self.max_bytes and self._entries:
+            k, _ = self._entries.popitem(last=False)
+            self._bytes -= self._sizes.pop(k, 0)
+
+    def _row(self, key: GlyphKey, cb: CharBitmap) -> tuple:
+        font_key, size_px, cp = key
+        img = cb.mask
+        return (
+            _fontKeyText(font_key), int(size_px), int(cp),
+            int(cb.width_adv), int(cb.bbox_w), int(cb.bbox_h), int(cb.ink_w), int(cb.ink_h),
+            int(cb.offset_x), int(cb.offset_y),
+            img.mode, img.size[0], img.size[1], sqlite3.Binary(img.tobytes()),
+            _fontPathText(font_key), int(time.time()),
+        )
+
+    def _trimDisk(self) -> None:
+        try:
+            groups = self._db.execute(
+                "SELECT font, size, SUM(LENGTH(data)) FROM glyphs GROUP BY font, size ORDER BY MAX(used)"
+            ).fetchall()
+            total = sum(nbytes for _, _, nbytes in groups)
+            removed = 0
+            for font_text, size_px, nbytes in groups:
+                if total <= self.max_disk_bytes:
+                    break
+                self._db.execute("DELETE FROM glyphs WHERE font = ? AND size = ?", (font_text, size_px))
+                total -= nbytes
+                removed += 1
+            if removed:
+                self._db.commit()
+                self._db.executescript("PRAGMA incremental_vacuum;")
+                logger.info(f"glyph cache: dropped {removed} font sizes to stay under {self.max_disk_bytes} bytes")
+        except Exception as e:
+            logger.warning(f"glyph cache: trim failed ({e})")
+
+    def _loadFromDisk(self, font_key: FontKey, size_px: int) -> None:
+        if (font_key, size_px) in self._loaded:
+            return
+        self._loaded.add((font_key, size_px))
+        try:
+            rows = self._db.execute(
+                "SELECT cp, width_adv, bbox_w, bbox_h, ink_w, ink_h, offset_x, offset_y, mode, img_w, img_h, data "
+                "FROM glyphs WHERE font = ? AND size = ?",
+                (_fontKeyText(font_key), int(size_px)),
+            ).fetchall()
+            if rows:
+                self._db.execute(
+                    "UPDATE glyphs SET used = ? WHERE font = ? AND size = ?",
+                    (int(time.time()), _fontKeyText(font_key), int(size_px)),
+                )
+                self._db.commit()
+        except Exception as e:
+            logger.warning(f"glyph cache: read failed ({e})")
+            return
+        for cp, width_adv, bbox_w, bbox_h, ink_w, ink_h, offset_x, offset_y, mode, img_w, img_h, data in rows:
+            key = (font_key, size_px, cp)
+            if key in self._entries:
+                continue
+            try:
+                img = Image.frombytes(mode, (img_w, img_h), bytes(data))
+            except Exception:
+                continue
+            self._store(key, CharBitmap(
+                codepoint=cp, mask=img, width_adv=width_adv, bbox_w=bbox_w, bbox_h=bbox_h,
+                ink_w=ink_w, ink_h=ink_h, offset_x=offset_x, offset_y=offset_y,
+            ))
+        logger.info(f"glyph cache: loaded {len(rows)} glyphs for size={size_px} from disk")
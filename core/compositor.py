@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from typing import Optional
+from PIL import Image
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+
+_COVERAGE_LUT = [0] + [255] * 255
+
+
+class PageCompositor:
+    def __init__(self, width: int, height: int):
+        self.width = int(width)
+        self.height = int(height)
+        self.overlaps = 0
+        self._alpha = None
+        self._page: Optional[Image.Image] = None
+        if np is not None:
+            self._alpha = np.zeros((self.height, self.width), dtype=np.uint8)
+        else:
+            self._page = Image.new("RGBA", (self.width, self.height), (0, 0, 0, 0))
+
+    def blit(self, mask: Image.Image, x: int, y: int) -> None:
+        if x < 0 or y < 0:
+            mw, mh = mask.size
+            if -x >= mw or -y >= mh:
+                return
+            mask = mask.crop((max(0, -x), max(0, -y), mw, mh))
+            x, y = max(0, x), max(0, y)
+        if self._alpha is None:
+            glyph_img = Image.new("RGBA", mask.size, (255, 255, 255, 0))
+            glyph_img.putalpha(mask)
+            self._page.alpha_composite(glyph_img, (x, y))
+            return
+        mw, mh = mask.size
+        w = min(mw, self.width - x)
+        h = min(mh, self.height - y)
+        if w <= 0 or h <= 0:
+            return
+        src = np.asarray(mask)
+        if w != mw or h != mh:
+            src = src[:h, :w]
+        dst = self._alpha[y:y + h, x:x + w]
+        if not dst.any():
+            dst[...] = src
+            return
+        self.overlaps += 1
+        s = src.astype(np.uint32)
+        outa255 = s * 255 + dst.astype(np.uint32) * (255 - s) + 0x80
+        dst[...] = (((outa255 >> 8) + outa255) >> 8).astype(np.uint8)
+
+    def toBuffer(self):
+        if self._alpha is None:
+            return self._page.getchannel("A").tobytes()
+        alpha, self._alpha = self._alpha, None
+        return alpha
+
+    def toImage(self) -> Image.Image:
+        if self._alpha is None:
+            return self._page.getchannel("A")
+        alpha = Image.fromarray(self._alpha)
+        self._alpha = None
+        return alpha
+
+
+def coverageToRGBA(alpha: Image.Image) -> Image.Image:
+    rgb = alpha.point(_COVERAGE_LUT)
+    return Image.merge("RGBA", (rgb, rgb, rgb, alpha))
+
+
+def coverageToLA(alpha: Image.Image) -> Image.Image:
+    return Image.merge("LA", (alpha.point(_COVERAGE_LUT), alpha))
+
+
+def coverageToStroke(alpha: Image.Image) -> Image.Image:
+    white = Image.new("L", alpha.size, 255)
+    return Image.merge("RGBA", (white, white, white, alpha.point(_COVERAGE_LUT)))
@@ -1,15 +1,37 @@
 from __future__ import annotations
 
 import os
-from typing import List, Optional, Tuple
+import json
+import time
+import zlib
+import hashlib
+import logging
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import replace
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Tuple
 from PIL import Image
 
-from ..types.models import FontMetrics, PageLayout
-from .pages import safeGeneratePages
-from .fonts import getFontCmapCodepoints
+from ..types.config import PngOptions
+from ..types.models import FontMetrics, GenerationStats, PageLayout, PagePlan
+from .pages import describePage, iterPages, pageSize, safePlanPageSizes
+from .fonts import getFontCmap
+from .cache import GlyphCache
+from .glyphs import RENDERER_VERSION
+from .compositor import coverageToLA, coverageToRGBA, coverageToStroke
+from .paths import fontFingerprint
+from .stats import addStageTime, memoryStage, timeStage, trackMemory
+from .memory import checkMemoryBudget, pageChannels, residentBytes
+from .profiling import ProfileRun
 
 
-def writeIni(path: str, metrics: FontMetrics, pages: List[PageLayout]) -> None:
+logger = logging.getLogger(__name__)
+
+_BUILD_MANIFEST_FORMAT = 1
+REDIR_KEYS = ("Common Normal", "Common Large", "Menu Normal", "Menu Bold")
+
+
+def _iniText(metrics: FontMetrics, pages: List[PageLayout]) -> str:
     out_lines: List[str] = []
     out_lines.append("[common]")
     out_lines.append(f"Baseline={metrics.baseline}")
@@ -38,49 +60,299 @@ def writeIni(path: str, metrics: FontMetrics, pages: List[PageLayout]) -> None:
         for i, w in enumerate(widths):
             out_lines.append(f"{i}={w}")
         out_lines.append("")
-    content = "\n".join(out_lines)
+    return "\n".join(out_lines)
+
+
+def writeIni(path: str, metrics: FontMetrics, pages: List[PageLayout]) -> None:
+    content = _iniText(metrics, pages)
     with open(path, "w", encoding="utf-8") as f:
         f.write(content)
 
 
+def _expandPage(image: Image.Image, page_mode: str = "RGBA") -> Image.Image:
+    if image.mode != "L":
+        return image
+    if page_mode.upper() == "LA":
+        return coverageToLA(image)
+    return coverageToRGBA(image)
+
+
+def _expandStroke(image: Image.Image, page_mode: str = "RGBA") -> Image.Image:
+    if image.mode != "L":
+        src = image.convert("L")
+        rgba = Image.new("RGBA", image.size, (255, 255, 255, 0))
+        rgba.putalpha(src)
+        return rgba
+    stroke = coverageToStroke(image)
+    if page_mode.upper() == "LA":
+        return stroke.convert("LA")
+    return stroke
+
+
+_PNG_STRATEGIES = {
+    "default": zlib.Z_DEFAULT_STRATEGY,
+    "filtered": zlib.Z_FILTERED,
+    "huffman": zlib.Z_HUFFMAN_ONLY,
+    "rle": zlib.Z_RLE,
+    "fixed": zlib.Z_FIXED,
+}
+
+
+def _pngSaveOptions(png_options: Optional[PngOptions]) -> dict:
+    opts: dict = {}
+    if png_options is None:
+        return opts
+    if png_options.compress_level is not None:
+        opts["compress_level"] = max(0, min(9, int(png_options.compress_level)))
+    if png_options.strategy:
+        key = str(png_options.strategy).strip().lower()
+        if key not in _PNG_STRATEGIES:
+            raise ValueError(f"unknown png strategy: {png_options.strategy}")
+        opts["compress_type"] = _PNG_STRATEGIES[key]
+    if png_options.optimize:
+        opts["optimize"] = True
+    return opts
+
+
+def _encodeWorkers(png_options: Optional[PngOptions]) -> int:
+    if png_options is not None and png_options.workers:
+        return max(1, int(png_options.workers))
+    return max(1, min(4, os.cpu_count() or 1))
+
+
+def _encodePng(image: Image.Image, file_name: str, page_mode: str, stroke: bool, save_opts: dict) -> Tuple[float, int]:
+    t0 = time.perf_counter()
+    if stroke:
+        _expandStroke(image, page_mode).save(file_name, format="PNG", **save_opts)
+    else:
+        _expandPage(image, page_mode).save(file_name, format="PNG", **save_opts)
+    return time.perf_counter() - t0, os.path.getsize(file_name)
+
+
+def _recordWrite(stats: Optional[GenerationStats], result: Tuple[float, int]) -> None:
+    if stats is None:
+        return
+    seconds, nbytes = result
+    addStageTime(stats, "png", seconds)
+    stats.files_written += 1
+    stats.bytes_written += nbytes
+
+
+def _pageFileNames(
+    save_base_path: str,
+    page: PageLayout,
+    export_stroke_templates: bool = False,
+    bitmap_append_suffix: str = "",
+) -> List[Tuple[str, bool]]:
+    suffix = bitmap_append_suffix or ""
+    names = [(f"{save_base_path} [{page.name}] {page.num_cols}x{page.num_rows}{suffix}.png", False)]
+    if export_stroke_templates:
+        names.append((f"{save_base_path} [{page.name}-stroke] {page.num_cols}x{page.num_rows}{suffix}.png", True))
+    return names
+
+
+def _savePageImages(
+    save_base_path: str,
+    pages: Iterable[PageLayout],
+    export_stroke_templates: bool = False,
+    bitmap_append_suffix: str = "",
+    page_mode: str = "RGBA",
+    png_options: Optional[PngOptions] = None,
+    stats: Optional[GenerationStats] = None,
+    max_in_flight: Optional[int] = None,
+) -> List[PageLayout]:
+    save_opts = _pngSaveOptions(png_options)
+    workers = _encodeWorkers(png_options)
+    if max_in_flight is not None:
+        workers = max(1, min(workers, int(max_in_flight)))
+    in_flight = max(1, int(max_in_flight)) if max_in_flight is not None else workers * 2
+    saved: List[PageLayout] = []
+    pending: Deque[Future] = deque()
+    pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for page in pages:
+            if page.image is None:
+                saved.append(page)
+                continue
+            for file_name, stroke in _pageFileNames(save_base_path, page, export_stroke_templates, bitmap_append_suffix):
+                if pool is None:
+                    _recordWrite(stats, _encodePng(page.image, file_name, page_mode, stroke, save_opts))
+                    continue
+                while len(pending) >= in_flight:
+                    _recordWrite(stats, pending.popleft().result())
+                pending.append(pool.submit(_encodePng, page.image, file_name, page_mode, stroke, save_opts))
+            saved.append(replace(page, image=None))
+            page = None
+        while pending:
+            _recordWrite(stats, pending.popleft().result())
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+    return saved
+
+
 def savePagesAndIni(
     save_base_path: str,
     metrics: FontMetrics,
-    pages: List[PageLayout],
+    pages: Iterable[PageLayout],
     export_stroke_templates: bool = False,
     bitmap_append_suffix: str = "",
+    page_mode: str = "RGBA",
+    png_options: Optional[PngOptions] = None,
+    stats: Optional[GenerationStats] = None,
 ) -> str:
     ini_path = f"{save_base_path}.ini"
-    for page in pages:
-        suffix = bitmap_append_suffix or ""
-        file_name = f"{save_base_path} [{page.name}] {page.num_cols}x{page.num_rows}{suffix}.png"
-        page.image.save(file_name, format="PNG")
-        if export_stroke_templates:
-            stroke_name = f"{save_base_path} [{page.name}-stroke] {page.num_cols}x{page.num_rows}{suffix}.png"
-            src = page.image.convert("L")
-            rgba = Image.new("RGBA", page.image.size, (255, 255, 255, 0))
-            rgba.putalpha(src)
-            rgba.save(stroke_name, format="PNG")
-    writeIni(ini_path, metrics, pages)
+    with memoryStage(stats, "write"):
+        saved = _savePageImages(save_base_path, pages, export_stroke_templates, bitmap_append_suffix, page_mode, png_options, stats)
+    with timeStage(stats, "ini"):
+        writeIni(ini_path, metrics, saved)
+    if stats is not None:
+        stats.files_written += 1
+        stats.bytes_written += os.path.getsize(ini_path)
     return ini_path
 
 
 def saveBitmapsOnly(
     save_base_path: str,
-    pages: List[PageLayout],
+    pages: Iterable[PageLayout],
     export_stroke_templates: bool = False,
     bitmap_append_suffix: str = "",
+    page_mode: str = "RGBA",
+    png_options: Optional[PngOptions] = None,
+    stats: Optional[GenerationStats] = None,
 ) -> None:
-    for page in pages:
-        suffix = bitmap_append_suffix or ""
-        file_name = f"{save_base_path} [{page.name}] {page.num_cols}x{page.num_rows}{suffix}.png"
-        page.image.save(file_name, format="PNG")
-        if export_stroke_templates:
-            stroke_name = f"{save_base_path} [{page.name}-stroke] {page.num_cols}x{page.num_rows}{suffix}.png"
-            src = page.image.convert("L")
-            rgba = Image.new("RGBA", page.image.size, (255, 255, 255, 0))
-            rgba.putalpha(src)
-            rgba.save(stroke_name, format="PNG")
+    _savePageImages(save_base_path, pages, export_stroke_templates, bitmap_append_suffix, page_mode, png_options, stats)
+
+
+def _loadBuildManifest(path: str) -> Dict[str, dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("format") == _BUILD_MANIFEST_FORMAT and isinstance(data.get("files"), dict):
+            return data["files"]
+    except Exception:
+        pass
+    return {}
+
+
+def _writeBuildManifest(path: str, files: Dict[str, dict]) -> None:
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"format": _BUILD_MANIFEST_FORMAT, "files": files}, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.warning(f"export: could not write build manifest {path} ({e})")
+
+
+def _fileUnchanged(path: str, entry: Optional[dict], digest: str) -> bool:
+    if not entry or entry.get("hash") != digest:
+        return False
+    try:
+        return os.path.getsize(path) == entry.get("bytes")
+    except OSError:
+        return False
+
+
+def _digest(*parts: str) -> str:
+    h = hashlib.sha1()
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _saveIncremental(
+    base_path: str,
+    font_path: str,
+    size_px: int,
+    metrics: FontMetrics,
+    plan: PagePlan,
+    export_stroke_templates: bool = False,
+    page_mode: str = "RGBA",
+    png_options: Optional[PngOptions] = None,
+    should_cancel: Optional[Callable[[], bool]] = None,
+    incremental: bool = True,
+    stats: Optional[GenerationStats] = None,
+    max_memory_mb: Optional[float] = None,
+) -> str:
+    save_dir = os.path.dirname(base_path) or "."
+    ini_path = f"{base_path}.ini"
+    max_in_flight = _pagesInFlight(plan, page_mode, png_options, max_memory_mb)
+    manifest_path = f"{base_path}.build.json"
+    old = _loadBuildManifest(manifest_path) if incremental else {}
+    try:
+        os.remove(manifest_path)
+    except OSError:
+        pass
+    shared = json.dumps([
+        _BUILD_MANIFEST_FORMAT, RENDERER_VERSION, list(fontFingerprint(font_path)), int(size_px),
+        plan.num_cols, plan.fixed_rows, plan.frame_w, plan.frame_h, plan.padding, plan.vertical,
+        plan.center_offset, plan.baseline_offset, page_mode.upper(), sorted(_pngSaveOptions(png_options).items()),
+    ])
+    files: Dict[str, dict] = {}
+    reused = 0
+
+    def _reuse(index: int) -> bool:
+        nonlocal reused
+        page = describePage(plan, index)
+        unchanged = True
+        for file_name, stroke in _pageFileNames(base_path, page, export_stroke_templates):
+            key = os.path.basename(file_name)
+            files[key] = {"hash": _digest(shared, json.dumps([plan.batches[index], page.num_rows, stroke]))}
+            unchanged = unchanged and _fileUnchanged(file_name, old.get(key), files[key]["hash"])
+        reused += int(unchanged)
+        return unchanged
+
+    with memoryStage(stats, "write"):
+        pages = _savePageImages(
+            base_path, iterPages(plan, should_cancel=should_cancel, release_glyphs=True, reuse=_reuse if incremental else None, stats=stats),
+            export_stroke_templates, page_mode=page_mode, png_options=png_options, stats=stats, max_in_flight=max_in_flight,
+        )
+    with timeStage(stats, "ini"):
+        content = _iniText(metrics, pages)
+        ini_key = os.path.basename(ini_path)
+        files[ini_key] = {"hash": _digest(content)}
+        if not _fileUnchanged(ini_path, old.get(ini_key), files[ini_key]["hash"]):
+            with open(ini_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            if stats is not None:
+                stats.files_written += 1
+                stats.bytes_written += os.path.getsize(ini_path)
+    if stats is not None:
+        stats.pages_reused += reused
+    if not incremental:
+        return ini_path
+    for key, entry in files.items():
+        entry["bytes"] = os.path.getsize(os.path.join(save_dir, key))
+    for key in old:
+        if key not in files:
+            try:
+                os.remove(os.path.join(save_dir, key))
+            except OSError:
+                pass
+    _writeBuildManifest(manifest_path, files)
+    logger.info(f"export: {os.path.basename(base_path)}: reused {reused} of {len(plan.batches)} pages")
+    return ini_path
+
+
+def _pagesInFlight(
+    plan: PagePlan,
+    page_mode: str,
+    png_options: Optional[PngOptions],
+    max_memory_mb: Optional[float],
+) -> Optional[int]:
+    if max_memory_mb is None or max_memory_mb <= 0 or not plan.batches:
+        return None
+    w, h = max((pageSize(plan, i) for i in range(len(plan.batches))), key=lambda wh: wh[0] * wh[1])
+    per_page = w * h * (2 + pageChannels(page_mode))
+    composing = w * h * 2
+    rss = residentBytes()
+    checkMemoryBudget(max_memory_mb, rss + per_page + composing, f"writing a {w}x{h} page", "lower max_chars_per_page or max_texture_size to shrink each page")
+    fits = int((max_memory_mb * 1024 * 1024 - rss - composing) // per_page)
+    in_flight = max(1, min(_encodeWorkers(png_options) * 2, fits))
+    logger.info(f"export: memory budget allows {in_flight} pages in flight ({w}x{h}, {rss / (1024 * 1024):.0f} MB in use)")
+    return in_flight
 
 
 def _makeBaseWithSize(base_path: str, new_size_px: int) -> str:
@@ -94,6 +366,41 @@ def _makeBaseWithSize(base_path: str, new_size_px: int) -> str:
     return os.path.join(base_dir, f"{base_name} {new_size_px}px")
 
 
+def needsDoubleRes(write_redir_files: bool, redir_modes: Optional[dict]) -> bool:
+    if not write_redir_files:
+        return False
+    modes = redir_modes or {}
+    return any(str(modes.get(k, "default")).lower() == "2x" for k in REDIR_KEYS)
+
+
+def outputBasePaths(base_path: str, size_px: int, write_redir_files: bool = True, redir_modes: Optional[dict] = None) -> List[str]:
+    paths = [base_path]
+    if needsDoubleRes(write_redir_files, redir_modes):
+        paths.append(_makeBaseWithSize(base_path, size_px * 2))
+    return paths
+
+
+def writeRedirFiles(base_path: str, size_px: int, redir_modes: Optional[dict] = None) -> None:
+    base_dir = os.path.dirname(base_path) or "."
+    small_name = os.path.basename(_makeBaseWithSize(base_path, size_px))
+    large_name = os.path.basename(_makeBaseWithSize(base_path, size_px * 2))
+    modes = redir_modes or {}
+    for key in REDIR_KEYS:
+        target_name = large_name if str(modes.get(key, "default")).lower() == "2x" else small_name
+        path = os.path.join(base_dir, f"{key}.redir")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                if f.read() == target_name + "\n":
+                    continue
+        except Exception:
+            pass
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(target_name + "\n")
+        except Exception:
+            pass
+
+
 def generateAndSave(
     font_path: str,
     size_px: int,
@@ -111,79 +418,69 @@ def generateAndSave(
     left_overlap: int = 0,
     right_overlap: int = 0,
     advance_extra: int = 0,
+    glyph_cache: Optional[GlyphCache] = None,
+    workers: int = 1,
+    page_mode: str = "RGBA",
+    png_options: Optional[PngOptions] = None,
+    codepoints: Optional[List[int]] = None,
+    max_texture_size: int = 4096,
+    progress_cb: Optional[Callable[[int, int], None]] = None,
+    should_cancel: Optional[Callable[[], bool]] = None,
+    incremental: bool = True,
+    stats: Optional[GenerationStats] = None,
+    profile: Optional[str] = None,
+    max_memory_mb: Optional[float] = None,
+    defer_redir_files: bool = False,
 ) -> str:
-    save_dir = os.path.dirname(base_path) or "."
-    group_name = os.path.basename(base_path) or "main"
-    cps = getFontCmapCodepoints(font_path)
-    metrics, pages = safeGeneratePages(
-        font_path=font_path,
-        size_px=size_px,
-        padding=padding,
-        save_dir=save_dir,
-        group_name=group_name,
-        codepoints=cps,
-        max_texture_size=4096,
-        progress_cb=None,
-        vertical=vertical,
-        max_chars_per_page=max_chars_per_page,
-        preset=preset,
-        center_offset=center_offset,
-        top_offset=top_offset,
-        baseline_offset=baseline_offset,
-        left_overlap=left_overlap,
-        right_overlap=right_overlap,
-        advance_extra=advance_extra,
-    )
-    ini_path = savePagesAndIni(base_path, metrics, pages, export_stroke_templates=export_stroke_templates)
-    need_double = False
-    if write_redir_files:
-        modes = redir_modes or {}
-        for k in ("Common Normal", "Common Large", "Menu Normal", "Menu Bold"):
-            if str(modes.get(k, "default")).lower() == "2x":
-                need_double = True
-                break
-    if need_double:
-        fixed_cols = pages[0].num_cols if pages else None
-        fixed_rows = pages[0].num_rows if pages else None
-        _metrics2, pages2 = safeGeneratePages(
+    with trackMemory(stats), ProfileRun(profile, base_path) as prof:
+        t0 = time.perf_counter()
+        save_dir = os.path.dirname(base_path) or "."
+        group_name = os.path.basename(base_path) or "main"
+        need_double = needsDoubleRes(write_redir_files, redir_modes)
+        sizes = [size_px, size_px * 2] if need_double else [size_px]
+        if codepoints is None:
+            with timeStage(stats, "cmap"):
+                codepoints = getFontCmap(font_path)
+        plans = safePlanPageSizes(
             font_path=font_path,
-            size_px=size_px * 2,
+            sizes=sizes,
             padding=padding,
             save_dir=save_dir,
             group_name=group_name,
-            codepoints=cps,
-            max_texture_size=4096,
-            progress_cb=None,
+            codepoints=codepoints,
+            max_texture_size=max_texture_size,
+            progress_cb=progress_cb,
             vertical=vertical,
             max_chars_per_page=max_chars_per_page,
             preset=preset,
-            fixed_cols=fixed_cols,
-            fixed_rows=fixed_rows,
             center_offset=center_offset,
             top_offset=top_offset,
             baseline_offset=baseline_offset,
             left_overlap=left_overlap,
             right_overlap=right_overlap,
             advance_extra=advance_extra,
+            should_cancel=should_cancel,
+            glyph_cache=glyph_cache,
+            workers=workers,
+            stats=stats,
+            max_memory_mb=max_memory_mb,
         )
-        doubled_base = _makeBaseWithSize(base_path, size_px * 2)
-        savePagesAndIni(doubled_base, _metrics2, pages2, export_stroke_templates=export_stroke_templates)
-    if write_redir_files:
-        base_dir = os.path.dirname(base_path) or "."
-        small_name = os.path.basename(_makeBaseWithSize(base_path, size_px))
-        large_name = os.path.basename(_makeBaseWithSize(base_path, size_px * 2))
-        def _writeRedir(filename: str, target_name: str):
-            try:
-                with open(os.path.join(base_dir, filename), "w", encoding="utf-8") as f:
-                    f.write(target_name + "\n")
-            except Exception:
-                pass
-        modes = redir_modes or {}
-        def _target(for_key: str) -> str:
-            m = str(modes.get(for_key, "default")).lower()
-            return large_name if (m == "2x") else small_name
-        _writeRedir("Common Normal.redir", _target("Common Normal"))
-        _writeRedir("Common Large.redir", _target("Common Large"))
-        _writeRedir("Menu Normal.redir", _target("Menu Normal"))
-        _writeRedir("Menu Bold.redir", _target("Menu Bold"))
+        metrics, plan = plans[0]
+        prof.describe(font_path, size_px, sum(len(batch) for batch in plan.batches))
+        ini_path = _saveIncremental(
+            base_path, font_path, size_px, metrics, plan, export_stroke_templates,
+            page_mode=page_mode, png_options=png_options, should_cancel=should_cancel, incremental=incremental, stats=stats,
+            max_memory_mb=max_memory_mb,
+        )
+        if need_double:
+            metrics2, plan2 = plans[1]
+            _saveIncremental(
+                _makeBaseWithSize(base_path, size_px * 2), font_path, size_px * 2, metrics2, plan2, export_stroke_templates,
+                page_mode=page_mode, png_options=png_options, should_cancel=should_cancel, incremental=incremental, stats=stats,
+                max_memory_mb=max_memory_mb,
+            )
+        if write_redir_files and not defer_redir_files:
+            writeRedirFiles(base_path, size_px, redir_modes)
+        if stats is not None:
+            stats.total_seconds += time.perf_counter() - t0
     return ini_path
\ No newline at end of file
@@ -1,11 +1,21 @@
 from __future__ import annotations
 
+import json
+import math
 import os
+import struct
+import threading
 import unicodedata
-from typing import Dict, List, Optional, Callable
+from array import array
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from io import BytesIO
+from typing import Dict, List, Optional, Callable, Tuple
 
 from PIL import ImageFont
 
+from .paths import fontFingerprint, splitFontPath
+
 try:
     import winreg
 except Exception:
@@ -18,23 +28,69 @@ except Exception:
     TTFont = None
     TTCollection = None
 
+try:
+    from fontTools.misc.encodingTools import getEncoding as _getNameEncoding
+except Exception:
+    _getNameEncoding = None
+
+
+_FONT_CACHE_SIZE = 32
+_FONT_CACHE_BYTES = 96 * 1024 * 1024
+_font_cache: "OrderedDict[tuple, Tuple[ImageFont.FreeTypeFont, tuple]]" = OrderedDict()
+_font_files: Dict[tuple, List] = {}
+_font_lock = threading.Lock()
+
+
+def _fontBytes(path: str, file_key: tuple) -> bytes:
+    with _font_lock:
+        entry = _font_files.get(file_key)
+        if entry is not None:
+            return entry[0]
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _cacheFont(key: tuple, file_key: tuple, font: ImageFont.FreeTypeFont, data: bytes) -> None:
+    with _font_lock:
+        if key in _font_cache:
+            return
+        entry = _font_files.setdefault(file_key, [data, 0])
+        entry[1] += 1
+        _font_cache[key] = (font, file_key)
+        while len(_font_cache) > 1 and (
+            len(_font_cache) > _FONT_CACHE_SIZE or sum(len(e[0]) for e in _font_files.values()) > _FONT_CACHE_BYTES
+        ):
+            _, (_, old_file_key) = _font_cache.popitem(last=False)
+            old = _font_files[old_file_key]
+            old[1] -= 1
+            if old[1] <= 0:
+                del _font_files[old_file_key]
+
 
 def loadFont(font_path: str, size_px: int) -> ImageFont.FreeTypeFont:
-    index = None
-    path = font_path
-    if "|index=" in font_path:
-        try:
-            path, idx_str = font_path.split("|index=", 1)
-            index = int(idx_str.strip())
-        except Exception:
-            path = font_path
-            index = None
+    path, index = splitFontPath(font_path)
+    try:
+        fingerprint = fontFingerprint(font_path)
+    except OSError:
+        return ImageFont.truetype(path, size_px, index=index or 0)
+    key = (fingerprint, size_px)
+    with _font_lock:
+        cached = _font_cache.get(key)
+        if cached is not None:
+            _font_cache.move_to_end(key)
+            return cached[0]
+    file_key = (fingerprint[0], fingerprint[2], fingerprint[3])
+    data = _fontBytes(path, file_key)
+    font = None
     try:
         if index is not None:
-            return ImageFont.truetype(path, size_px, index=index)
+            font = ImageFont.truetype(BytesIO(data), size_px, index=index)
     except Exception:
         pass
-    return ImageFont.truetype(path, size_px)
+    if font is None:
+        font = ImageFont.truetype(BytesIO(data), size_px)
+    _cacheFont(key, file_key, font, data)
+    return font
 
 
 def _canonicalizeFamily(name: str) -> str:
@@ -73,17 +129,20 @@ def _getFamilyFromNameTable(tt: "TTFont") -> Optional[str]:
     return preferred or fallback
 
 
-def getFontCmapCodepoints(font_path: str) -> List[int]:
-    tt: Optional[TTFont] = None
+_CMAP_CACHE_SIZE = 16
+_cmap_cache: "OrderedDict[tuple, array]" = OrderedDict()
+_cmap_lock = threading.Lock()
+
+
+def _readFontCmap(font_path: str) -> array:
+    path, index = splitFontPath(font_path)
+    if path.lower().endswith(".ttc"):
+        tt = TTFont(path, fontNumber=int(index or 0), lazy=True)
+    else:
+        tt = TTFont(path, lazy=True)
     try:
-        if font_path.lower().endswith(".ttc") and TTCollection is not None:
-            col = TTCollection(font_path)
-            if col.fonts:
-                tt = col.fonts[0]
-        if tt is None and TTFont is not None:
-            tt = TTFont(font_path, lazy=True)
-        cmap = tt.getBestCmap() if tt else {}
-        cps: List[int] = []
+        cmap = tt.getBestCmap() or {}
+        cps = array("I")
         for cp in sorted(cmap.keys()):
             try:
                 cat = unicodedata.category(chr(cp))
@@ -92,14 +151,53 @@ def getFontCmapCodepoints(font_path: str) -> List[int]:
             if cat.startswith("C"):
                 continue
             cps.append(cp)
-        if hasattr(tt, "close") and callable(getattr(tt, "close")):
-            try:
-                tt.close()
-            except Exception:
-                pass
         return cps
+    finally:
+        try:
+            tt.close()
+        except Exception:
+            pass
+
+
+def getFontCmap(font_path: str) -> array:
+    try:
+        key = fontFingerprint(font_path)
+    except OSError:
+        return array("I")
+    with _cmap_lock:
+        cps = _cmap_cache.get(key)
+        if cps is not None:
+            _cmap_cache.move_to_end(key)
+            return cps
+    try:
+        cps = _readFontCmap(font_path)
+    except Exception:
+        return array("I")
+    with _cmap_lock:
+        _cmap_cache[key] = cps
+        while len(_cmap_cache) > _CMAP_CACHE_SIZE:
+            _cmap_cache.popitem(last=False)
+    return cps
+
+
+def getFontCmapCodepoints(font_path: str) -> List[int]:
+    return getFontCmap(font_path).tolist()
+
+
+_PLAIN_STYLES = ("regular", "book", "normal", "roman")
+
+
+def fontDisplayName(font_path: str) -> str:
+    try:
+        family, style = loadFont(font_path, 16).getname()
     except Exception:
-        return []
+        family, style = "", ""
+    family = (family or "").lstrip("@")
+    if not family:
+        return os.path.splitext(os.path.basename(splitFontPath(font_path)[0]))[0] or "Font"
+    if style and style.strip().lower() not in _PLAIN_STYLES:
+        return f"{family} {style.strip()}"
+    return family
 
 
 def safeCharFromCodepoint(cp: int) -> Optional[str]:
@@ -109,9 +207,228 @@ def safeCharFromCodepoint(cp: int) -> Optional[str]:
         return None
 
 
+_FONT_INDEX_FORMAT = 1
+_PARALLEL_SCAN_MIN_FILES = 20000
+
+
+def _readNameRecord(tt: "TTFont", name_id: int) -> Optional[str]:
+    nm = tt.get("name")
+    if not nm:
+        return None
+    for rec in nm.names:
+        if rec.nameID == name_id:
+            try:
+                return rec.toUnicode()
+            except Exception:
+                return rec.string.decode(errors="ignore") if isinstance(rec.string, (bytes, bytearray)) else str(rec.string)
+    return None
+
+
+_SFNT_VERSIONS = (b"\x00\x01\x00\x00", b"OTTO", b"true")
+
+
+def _nameEncoding(platform_id: int, enc_id: int, lang_id: int) -> str:
+    if _getNameEncoding is not None:
+        return _getNameEncoding(platform_id, enc_id, lang_id, "ascii")
+    if platform_id == 0 or (platform_id == 3 and enc_id in (0, 1, 10)):
+        return "utf_16_be"
+    if platform_id == 1 and enc_id == 0:
+        return "mac_roman"
+    return "ascii"
+
+
+def _isNameAscii(b: int) -> bool:
+    return 0x20 <= b <= 0x7E or b in (0x09, 0x0A, 0x0D)
+
+
+def _decodeNameString(platform_id: int, enc_id: int, lang_id: int, raw: bytes) -> str:
+    encoding = _nameEncoding(platform_id, enc_id, lang_id)
+    if encoding == "utf_16_be" and len(raw) % 2 == 1:
+        if raw[-1] == 0:
+            raw = raw[:-1]
+        elif all(b == 0 if i % 2 else _isNameAscii(b) for i, b in enumerate(raw)):
+            raw = b"\0" + raw
+        elif raw[0] == 0 and all(_isNameAscii(b) for b in raw[1:]):
+            raw = b"".join(b"\0" + bytes([b]) for b in raw[1:])
+    text = raw.decode(encoding)
+    if all(ord(c) == 0 if i % 2 == 0 else _isNameAscii(ord(c)) for i, c in enumerate(text)):
+        text = text[1::2]
+    return text
+
+
+def _nameText(platform_id: int, enc_id: int, lang_id: int, raw: bytes) -> str:
+    try:
+        return _decodeNameString(platform_id, enc_id, lang_id, raw)
+    except Exception:
+        return raw.decode(errors="ignore")
+
+
+def _readSfntNames(f, face_offset: int) -> Tuple[Optional[str], Optional[str]]:
+    f.seek(face_offset)
+    head = f.read(12)
+    if len(head) < 12 or head[:4] not in _SFNT_VERSIONS:
+        raise ValueError("not an sfnt font")
+    num_tables = struct.unpack(">H", head[4:6])[0]
+    directory = f.read(16 * num_tables)
+    if len(directory) < 16 * num_tables:
+        raise ValueError("truncated table directory")
+    table = None
+    for i in range(num_tables):
+        tag, _checksum, offset, length = struct.unpack(">4sLLL", directory[16 * i:16 * i + 16])
+        if tag == b"name":
+            f.seek(offset)
+            table = f.read(length)
+            if len(table) < length:
+                raise ValueError("truncated name table")
+            break
+    if table is None:
+        return None, None
+    _format, count, string_offset = struct.unpack(">HHH", table[:6])
+    strings = table[string_offset:]
+    preferred = None
+    fallback = None
+    subfam = None
+    seen_subfam = False
+    for i in range(count):
+        rec = table[6 + 12 * i:18 + 12 * i]
+        if len(rec) < 12:
+            continue
+        platform_id, enc_id, lang_id, name_id, length, offset = struct.unpack(">HHHHHH", rec)
+        if offset + length > len(strings):
+            continue
+        if name_id not in (1, 2, 16):
+            continue
+        text = _nameText(platform_id, enc_id, lang_id, strings[offset:offset + length])
+        if name_id == 16 and text and preferred is None:
+            preferred = text
+        elif name_id == 1 and text and preferred is None:
+            fallback = text
+        elif name_id == 2 and not seen_subfam:
+            subfam = text
+            seen_subfam = True
+    return preferred or fallback, subfam
+
+
+def _readFontFacesFast(p: str) -> List[Tuple[str, str, str]]:
+    faces: List[Tuple[str, str, str]] = []
+    with open(p, "rb") as f:
+        head = f.read(12)
+        if p.lower().endswith(".ttc"):
+            if len(head) < 12 or head[:4] != b"ttcf":
+                raise ValueError("not a font collection")
+            num_fonts = struct.unpack(">L", head[8:12])[0]
+            offsets_raw = f.read(4 * num_fonts)
+            if len(offsets_raw) < 4 * num_fonts:
+                raise ValueError("truncated collection header")
+            offsets = struct.unpack(f">{num_fonts}L", offsets_raw)
+            names = [_readSfntNames(f, offset) for offset in offsets]
+            for idx, (fam, subfam) in enumerate(names):
+                if fam:
+                    faces.append((fam, _normalizeSubfamily(subfam), f"{p}|index={idx}"))
+        else:
+            fam, subfam = _readSfntNames(f, 0)
+            if fam:
+                faces.append((fam, _normalizeSubfamily(subfam), p))
+    return faces
+
+
+def _readFontFaces(p: str) -> List[Tuple[str, str, str]]:
+    try:
+        return _readFontFacesFast(p)
+    except Exception:
+        pass
+    faces: List[Tuple[str, str, str]] = []
+    try:
+        if p.lower().endswith(".ttc") and TTCollection is not None:
+            col = TTCollection(p)
+            for idx, f in enumerate(col.fonts):
+                fam = _getFamilyFromNameTable(f)
+                if fam:
+                    faces.append((fam, _normalizeSubfamily(_readNameRecord(f, 2)), f"{p}|index={idx}"))
+        elif TTFont is not None:
+            tt = TTFont(p, lazy=True)
+            fam = _getFamilyFromNameTable(tt)
+            subfam = _readNameRecord(tt, 2)
+            try:
+                tt.close()
+            except Exception:
+                pass
+            if fam:
+                faces.append((fam, _normalizeSubfamily(subfam), p))
+    except Exception:
+        pass
+    return faces
+
+
+def _fontIndexPath(cache_dir: str) -> str:
+    return os.path.join(cache_dir, f"fonts-v{_FONT_INDEX_FORMAT}.json")
+
+
+def _loadFontIndex(cache_dir: str) -> Dict[str, dict]:
+    try:
+        with open(_fontIndexPath(cache_dir), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _saveFontIndex(cache_dir: str, index: Dict[str, dict]) -> None:
+    path = _fontIndexPath(cache_dir)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            os.remove(tmp)
+        except Exception:
+            pass
+
+
+def _readFontFacesChunk(paths: List[str]) -> List[List[Tuple[str, str, str]]]:
+    return [_readFontFaces(p) for p in paths]
+
+
+def _readFontFacesInPool(
+    paths: List[str],
+    workers: int,
+    found: Dict[str, list],
+    progress: Callable[[int], None],
+    should_cancel: Optional[Callable[[], bool]],
+) -> bool:
+    chunk = max(8, math.ceil(len(paths) / (workers * 4)))
+    parts = [paths[i:i + chunk] for i in range(0, len(paths), chunk)]
+    done_count = 0
+    pool = ProcessPoolExecutor(max_workers=min(workers, len(parts)))
+    try:
+        pending = {pool.submit(_readFontFacesChunk, part): part for part in parts}
+        while pending:
+            if should_cancel and should_cancel():
+                return True
+            done, _ = wait(list(pending), timeout=0.1, return_when=FIRST_COMPLETED)
+            for fut in done:
+                part = pending.pop(fut)
+                try:
+                    results = fut.result()
+                except Exception:
+                    results = [_readFontFaces(p) for p in part]
+                for p, faces in zip(part, results):
+                    found[p] = faces
+                done_count += len(part)
+                progress(done_count)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return False
+
+
 def enumerateFontVariantsWithProgress(
     progress_cb: Optional[Callable[[int, int], None]] = None,
     should_cancel: Optional[Callable[[], bool]] = None,
+    cache_dir: Optional[str] = None,
+    workers: int = 1,
 ) -> Dict[str, Dict[str, str]]:
     variants: Dict[str, Dict[str, str]] = {}
     entries: List[tuple] = []
@@ -155,57 +472,58 @@ def enumerateFontVariantsWithProgress(
                     files.append(p)
         except Exception:
             continue
-    total = len(files)
-    done = 0
+    cache = _loadFontIndex(cache_dir) if cache_dir else {}
+    index: Dict[str, dict] = {}
+    stamps: Dict[str, Optional[List[int]]] = {}
+    found: Dict[str, list] = {}
+    todo: List[str] = []
     for p in files:
-        if should_cancel and should_cancel():
-            break
         try:
-            if p.lower().endswith(".ttc") and TTCollection is not None:
-                col = TTCollection(p)
-                for idx, f in enumerate(col.fonts):
-                    fam = _getFamilyFromNameTable(f)
-                    subfam = None
-                    nm = f.get("name")
-                    if nm:
-                        for rec in nm.names:
-                            if rec.nameID == 2:
-                                try:
-                                    subfam = rec.toUnicode()
-                                except Exception:
-                                    subfam = rec.string.decode(errors="ignore") if isinstance(rec.string, (bytes, bytearray)) else str(rec.string)
-                                break
-                    if fam:
-                        style = _normalizeSubfamily(subfam)
-                        variants.setdefault(fam, {})[style] = f"{p}|index={idx}"
-            elif TTFont is not None:
-                tt = TTFont(p, lazy=True)
-                fam = _getFamilyFromNameTable(tt)
-                subfam = None
-                nm = tt.get("name")
-                if nm:
-                    for rec in nm.names:
-                        if rec.nameID == 2:
-                            try:
-                                subfam = rec.toUnicode()
-                            except Exception:
-                                subfam = rec.string.decode(errors="ignore") if isinstance(rec.string, (bytes, bytearray)) else str(rec.string)
-                            break
-                try:
-                    tt.close()
-                except Exception:
-                    pass
-                if fam:
-                    style = _normalizeSubfamily(subfam)
-                    variants.setdefault(fam, {})[style] = p
-        except Exception:
-            pass
-        done += 1
+            st = os.stat(p)
+            stamp = [int(st.st_size), int(st.st_mtime_ns)]
+        except OSError:
+            stamp = None
+        stamps[p] = stamp
+        entry = cache.get(p)
+        if stamp is not None and isinstance(entry, dict) and entry.get("stamp") == stamp:
+            found[p] = entry.get("faces") or []
+        else:
+            todo.append(p)
+    total = len(files)
+    done = len(found)
+
+    def _progress(n: int) -> None:
         if progress_cb:
             try:
-                progress_cb(done, total)
+                progress_cb(n, total)
             except Exception:
                 pass
+    if done:
+        _progress(done)
+    workers = int(workers) if workers > 0 else (os.cpu_count() or 1)
+    if workers > 1 and len(todo) > _PARALLEL_SCAN_MIN_FILES:
+        cancelled = _readFontFacesInPool(todo, workers, found, lambda n: _progress(done + n), should_cancel)
+    else:
+        cancelled = False
+        for p in todo:
+            if should_cancel and should_cancel():
+                cancelled = True
+                break
+            found[p] = _readFontFaces(p)
+            _progress(len(found))
+    for p in files:
+        faces = found.get(p)
+        if faces is None:
+            continue
+        if stamps[p] is not None:
+            index[p] = {"stamp": stamps[p], "faces": faces}
+        for fam, style, face_path in faces:
+            variants.setdefault(fam, {})[style] = face_path
+    if cache_dir:
+        if cancelled:
+            index = {**cache, **index}
+        if index != cache:
+            _saveFontIndex(cache_dir, index)
     return variants
 
 
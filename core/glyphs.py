@@ -1,25 +1,11 @@
 from __future__ import annotations
 
-from typing import Tuple
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageFont, __version__ as _PIL_VERSION
 
 from ..types.models import CharBitmap
 
 
-def _measureCharSize(font: ImageFont.FreeTypeFont, ch: str) -> Tuple[int, int]:
-    try:
-        bbox = font.getbbox(ch)
-        if bbox:
-            w = bbox[2] - bbox[0]
-            h = bbox[3] - bbox[1]
-            return max(w, 1), max(h, 1)
-    except Exception:
-        pass
-    try:
-        w, h = font.getsize(ch)
-        return max(w, 1), max(h, 1)
-    except Exception:
-        return 1, 1
+RENDERER_VERSION = f"{_PIL_VERSION}/{getattr(getattr(ImageFont, 'core', None), 'freetype2_version', '')}"
 
 
 def renderCharBitmap(font: ImageFont.FreeTypeFont, ch: str) -> CharBitmap:
@@ -27,17 +13,65 @@ def renderCharBitmap(font: ImageFont.FreeTypeFont, ch: str) -> CharBitmap:
         width_adv = int(round(font.getlength(ch)))
     except Exception:
         width_adv = font.getsize(ch)[0]
-    est_w, est_h = _measureCharSize(font, ch)
+    core, (mask_x, mask_y) = font.getmask2(ch, mode="L")
+    mask = Image.Image()._new(core)
+    mask_w, mask_h = mask.size
+    est_w, est_h = max(mask_w, 1), max(mask_h, 1)
     canvas_w = max(est_w + 4, width_adv)
     canvas_h = max(est_h + 4, font.size + 8)
-    img = Image.new("RGBA", (canvas_w, canvas_h), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    draw.text((0, 0), ch, font=font, fill=(255, 255, 255, 255))
-    bbox = img.getbbox()
+    x0 = max(0, -mask_x)
+    y0 = max(0, -mask_y)
+    x1 = min(mask_w, canvas_w - mask_x)
+    y1 = min(mask_h, canvas_h - mask_y)
+    bbox = None
+    if x1 > x0 and y1 > y0:
+        if (x0, y0, x1, y1) == (0, 0, mask_w, mask_h):
+            bbox = mask.getbbox()
+        else:
+            bbox = mask.crop((x0, y0, x1, y1)).getbbox()
     if bbox is None:
-        cropped = Image.new("RGBA", (max(width_adv, 1), 1), (0, 0, 0, 0))
-        bbox_w, bbox_h = cropped.size
-    else:
-        cropped = img.crop((0, 0, bbox[2], bbox[3]))
-        bbox_w, bbox_h = cropped.size
-    return CharBitmap(codepoint=ord(ch), image=cropped, width_adv=width_adv, bbox_w=bbox_w, bbox_h=bbox_h)
\ No newline at end of file
+        empty_w = max(width_adv, 1)
+        return CharBitmap(
+            codepoint=ord(ch),
+            mask=Image.new("L", (empty_w, 1), 0),
+            width_adv=width_adv,
+            bbox_w=empty_w,
+            bbox_h=1,
+            ink_w=est_w,
+            ink_h=est_h,
+        )
+    left, top, right, bottom = x0 + bbox[0], y0 + bbox[1], x0 + bbox[2], y0 + bbox[3]
+    return CharBitmap(
+        codepoint=ord(ch),
+        mask=mask.crop((left, top, right, bottom)),
+        width_adv=width_adv,
+        bbox_w=mask_x + right,
+        bbox_h=mask_y + bottom,
+        ink_w=est_w,
+        ink_h=est_h,
+        offset_x=mask_x + left,
+        offset_y=mask_y + top,
+    )
+
+
+def rotateCharBitmap(cb: CharBitmap) -> CharBitmap:
+    mask_w = cb.mask.size[0]
+    return CharBitmap(
+        codepoint=cb.codepoint,
+        mask=cb.mask.rotate(90, expand=True),
+        width_adv=cb.width_adv,
+        bbox_w=cb.bbox_h,
+        bbox_h=cb.bbox_w,
+        ink_w=cb.ink_h,
+        ink_h=cb.ink_w,
+        offset_x=cb.offset_y,
+        offset_y=cb.bbox_w - cb.offset_x - mask_w,
+    )
+
+
+def charBitmapToRGBA(cb: CharBitmap) -> Image.Image:
+    alpha = Image.new("L", (max(cb.bbox_w, 1), max(cb.bbox_h, 1)), 0)
+    alpha.paste(cb.mask, (cb.offset_x, cb.offset_y))
+    img = Image.new("RGBA", alpha.size, (255, 255, 255, 0))
+    img.putalpha(alpha)
+    return img
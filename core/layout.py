@@ -1,23 +1,17 @@
 from __future__ import annotations
 
 import math
-from typing import List, Tuple
-from PIL import ImageFont
+from typing import Dict, Tuple
 
-from .fonts import safeCharFromCodepoint
-from .glyphs import _measureCharSize
+from ..types.models import CharBitmap
 
 
-def computeGlobalBoundsByMeasure(font: ImageFont.FreeTypeFont, cps: List[int]) -> Tuple[int, int]:
+def computeGlobalBoundsFromTable(table: Dict[int, CharBitmap]) -> Tuple[int, int]:
     max_w = 0
     max_h = 0
-    for cp in cps:
-        ch = safeCharFromCodepoint(cp)
-        if not ch:
-            continue
-        w, h = _measureCharSize(font, ch)
-        max_w = max(max_w, w)
-        max_h = max(max_h, h)
+    for cb in table.values():
+        max_w = max(max_w, cb.ink_w)
+        max_h = max(max_h, cb.ink_h)
     return max_w, max_h
 
 
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import tracemalloc
+from typing import Dict, Optional
+
+
+_MB = 1024 * 1024
+_GLYPH_OVERHEAD_BYTES = 800
+_GLYPH_AREA_RATIO = 0.6
+
+
+def _windowsMemoryCounters():
+    import ctypes
+    from ctypes import wintypes
+
+    class _Counters(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    counters = _Counters()
+    counters.cb = ctypes.sizeof(_Counters)
+    kernel32 = ctypes.windll.kernel32
+    kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+        return None
+    return counters
+
+
+def peakRssBytes() -> Optional[int]:
+    if sys.platform.startswith("win"):
+        try:
+            counters = _windowsMemoryCounters()
+            return int(counters.PeakWorkingSetSize) if counters is not None else None
+        except Exception:
+            return None
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except Exception:
+        return None
+    return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+
+
+def currentRssBytes() -> Optional[int]:
+    if sys.platform.startswith("win"):
+        try:
+            counters = _windowsMemoryCounters()
+            return int(counters.WorkingSetSize) if counters is not None else None
+        except Exception:
+            return None
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        return None
+
+
+def residentBytes() -> int:
+    return currentRssBytes() or peakRssBytes() or 0
+
+
+def estimateGlyphTableBytes(count: int, size_px: int) -> int:
+    return int(count * (_GLYPH_OVERHEAD_BYTES + _GLYPH_AREA_RATIO * size_px * size_px))
+
+
+def pageChannels(page_mode: str = "RGBA") -> int:
+    return 2 if str(page_mode).upper() == "LA" else 4
+
+
+def checkMemoryBudget(max_memory_mb: Optional[float], needed_bytes: int, what: str, advice: str) -> None:
+    if max_memory_mb is None or max_memory_mb <= 0:
+        return
+    if needed_bytes > max_memory_mb * _MB:
+        raise MemoryError(
+            f"{what} needs about {needed_bytes / _MB:.0f} MB but max_memory_mb is {max_memory_mb:g}; "
+            f"raise the budget or {advice}"
+        )
+
+
+class MemoryMonitor(threading.Thread):
+    def __init__(self, interval: float = 0.01):
+        super().__init__(name="memory-monitor", daemon=True)
+        self.interval = interval
+        self.stage = "other"
+        self.peak = 0
+        self.stage_peaks: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._tracing = False
+        if currentRssBytes() is None and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+
+    def _read(self) -> int:
+        rss = currentRssBytes()
+        if rss is None and tracemalloc.is_tracing():
+            rss = tracemalloc.get_traced_memory()[0]
+        return int(rss or 0)
+
+    def sample(self) -> None:
+        value = self._read()
+        with self._lock:
+            self.stage_peaks[self.stage] = max(self.stage_peaks.get(self.stage, 0), value)
+            self.peak = max(self.peak, value)
+
+    def enter(self, stage: str) -> str:
+        self.sample()
+        with self._lock:
+            previous, self.stage = self.stage, stage
+        return previous
+
+    def leave(self, previous: str) -> None:
+        self.sample()
+        with self._lock:
+            self.stage = previous
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self.sample()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+        self.sample()
+        if self._tracing:
+            tracemalloc.stop()
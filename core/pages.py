@@ -2,20 +2,30 @@ from __future__ import annotations
 
 import math
 import os
+import time
 import logging
-from typing import List, Optional, Callable, Tuple
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Callable, Tuple, TypeVar
 
-from PIL import Image
+from PIL import ImageFont
 
-from ..types.models import FontMetrics, PageLayout
-from .fonts import loadFont, getFontCmapCodepoints, safeCharFromCodepoint
+from ..types.models import CharBitmap, FontMetrics, GenerationStats, PageLayout, PagePlan
+from .fonts import loadFont, getFontCmap, safeCharFromCodepoint
 from .metrics import measureFontMetrics
-from .glyphs import renderCharBitmap
-from .layout import computeGlobalBoundsByMeasure, chooseColumns
+from .glyphs import renderCharBitmap, rotateCharBitmap
+from .layout import computeGlobalBoundsFromTable, chooseColumns
+from .cache import FontKey, GlyphCache
+from .compositor import PageCompositor
+from .paths import fontFingerprint, splitFontPath
+from .stats import countGlyphs, timeStage, trackMemory
+from .memory import checkMemoryBudget, estimateGlyphTableBytes, residentBytes
+from .profiling import ProfileRun
 
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 def _filterCodepointsByPreset(cps: List[int], preset: Optional[str]) -> Tuple[List[int], str]:
     if not preset:
@@ -44,7 +54,348 @@ def _filterCodepointsByPreset(cps: List[int], preset: Optional[str]) -> Tuple[Li
     return cps, "main"
 
 
-def generatePages(
+def _fillGlyphTable(
+    table: Dict[int, CharBitmap],
+    font: ImageFont.FreeTypeFont,
+    cps: List[int],
+    glyph_cache: Optional[GlyphCache] = None,
+    font_key: Optional[FontKey] = None,
+    progress: Optional[Callable[[int], None]] = None,
+    should_cancel: Optional[Callable[[], bool]] = None,
+) -> None:
+    for n, cp in enumerate(cps):
+        if n % 64 == 0:
+            if should_cancel and should_cancel():
+                raise RuntimeError("Cancelled")
+            if progress and n:
+                progress(n)
+        ch = safeCharFromCodepoint(cp)
+        if not ch:
+            continue
+        cb = renderCharBitmap(font, ch)
+        if glyph_cache is not None:
+            glyph_cache.put((font_key, int(font.size), cp), cb)
+        table[cp] = cb
+    if progress:
+        progress(len(cps))
+
+
+_worker_cache: Optional[GlyphCache] = None
+
+
+def _initGlyphWorker(cache_dir: Optional[str], cache_bytes: int) -> None:
+    global _worker_cache
+    if cache_dir:
+        _worker_cache = GlyphCache(max_bytes=cache_bytes, cache_dir=cache_dir)
+
+
+def _renderGlyphsInWorker(font_path: str, size_px: int, cps: List[int]) -> Dict[int, CharBitmap]:
+    font = loadFont(font_path, size_px)
+    font_key = fontFingerprint(font_path) if _worker_cache is not None else None
+    table: Dict[int, CharBitmap] = {}
+    _fillGlyphTable(table, font, cps, _worker_cache, font_key)
+    if _worker_cache is not None:
+        _worker_cache.flush()
+    return table
+
+
+def _fillGlyphTablesInPool(
+    tables: Dict[int, Dict[int, CharBitmap]],
+    font_path: str,
+    missing: Dict[int, List[int]],
+    workers: int,
+    glyph_cache: Optional[GlyphCache],
+    font_key: Optional[FontKey],
+    progress: Optional[Callable[[int], None]],
+    should_cancel: Optional[Callable[[], bool]],
+) -> None:
+    cache_dir = glyph_cache.cache_dir if glyph_cache is not None else None
+    cache_bytes = glyph_cache.max_bytes if glyph_cache is not None else 0
+    total_missing = sum(len(cps) for cps in missing.values())
+    chunk = max(256, math.ceil(total_missing / (workers * 4)))
+    jobs: List[Tuple[int, List[int]]] = []
+    for size_px, cps in missing.items():
+        for i in range(0, len(cps), chunk):
+            jobs.append((size_px, cps[i:i + chunk]))
+    done_count = 0
+    logger.info(f"gen: {total_missing} glyphs in {len(jobs)} chunks on {workers} workers")
+    pool = ProcessPoolExecutor(
+        max_workers=min(workers, len(jobs)),
+        initializer=_initGlyphWorker,
+        initargs=(cache_dir, cache_bytes),
+    )
+    try:
+        futures = [pool.submit(_renderGlyphsInWorker, font_path, size_px, part) for size_px, part in jobs]
+        for fut, (size_px, part) in zip(futures, jobs):
+            while True:
+                if should_cancel and should_cancel():
+                    raise RuntimeError("Cancelled")
+                done, _ = wait([fut], timeout=0.1)
+                if done:
+                    break
+            part_table = fut.result()
+            table = tables[size_px]
+            for cp in part:
+                cb = part_table.get(cp)
+                if cb is None:
+                    continue
+                table[cp] = cb
+                if glyph_cache is not None:
+                    glyph_cache.put((font_key, size_px, cp), cb, persist=False)
+            done_count += len(part)
+            if progress:
+                progress(done_count)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def buildGlyphTables(
+    font_path: str,
+    sizes: List[int],
+    cps: List[int],
+    fonts: Optional[Dict[int, ImageFont.FreeTypeFont]] = None,
+    glyph_cache: Optional[GlyphCache] = None,
+    workers: int = 1,
+    progress_cb: Optional[Callable[[int, int], None]] = None,
+    should_cancel: Optional[Callable[[], bool]] = None,
+    stats: Optional[GenerationStats] = None,
+) -> Dict[int, Dict[int, CharBitmap]]:
+    with timeStage(stats, "rasterize"):
+        tables = _buildGlyphTables(font_path, sizes, cps, fonts, glyph_cache, workers, progress_cb, should_cancel, stats)
+    for table in tables.values():
+        countGlyphs(stats, table)
+    return tables
+
+
+def _buildGlyphTables(
+    font_path: str,
+    sizes: List[int],
+    cps: List[int],
+    fonts: Optional[Dict[int, ImageFont.FreeTypeFont]],
+    glyph_cache: Optional[GlyphCache],
+    workers: int,
+    progress_cb: Optional[Callable[[int, int], None]],
+    should_cancel: Optional[Callable[[], bool]],
+    stats: Optional[GenerationStats],
+) -> Dict[int, Dict[int, CharBitmap]]:
+    sizes = list(dict.fromkeys(int(s) for s in sizes))
+    fonts = dict(fonts or {})
+    font_key = fontFingerprint(font_path) if glyph_cache is not None else None
+    total = len(cps) * len(sizes)
+
+    def _progress(done: int) -> None:
+        if progress_cb:
+            try:
+                progress_cb(done, total)
+            except Exception:
+                pass
+    tables: Dict[int, Dict[int, CharBitmap]] = {}
+    missing: Dict[int, List[int]] = {}
+    for size_px in sizes:
+        table: Dict[int, CharBitmap] = {}
+        tables[size_px] = table
+        if glyph_cache is None:
+            missing[size_px] = cps
+            continue
+        todo: List[int] = []
+        for cp in cps:
+            cb = glyph_cache.get((font_key, size_px, cp))
+            if cb is None:
+                todo.append(cp)
+            else:
+                table[cp] = cb
+        missing[size_px] = todo
+    hit_count = total - sum(len(todo) for todo in missing.values())
+    if hit_count:
+        logger.info(f"gen: {hit_count}/{total} glyphs from cache")
+    if stats is not None and glyph_cache is not None:
+        stats.cache_hits += hit_count
+        stats.cache_misses += total - hit_count
+    if workers and int(workers) > 1 and total - hit_count > 256:
+        _fillGlyphTablesInPool(
+            tables, font_path, missing, int(workers), glyph_cache, font_key,
+            lambda n: _progress(hit_count + n), should_cancel,
+        )
+    else:
+        done_before = hit_count
+        for size_px in sizes:
+            font = fonts.get(size_px)
+            if font is None:
+                font = loadFont(font_path, size_px)
+            base = done_before
+            _fillGlyphTable(
+                tables[size_px], font, missing[size_px], glyph_cache, font_key,
+                lambda n, base=base: _progress(base + n), should_cancel,
+            )
+            done_before += len(missing[size_px])
+    if glyph_cache is not None:
+        glyph_cache.flush()
+    return tables
+
+
+def buildGlyphTable(
+    font_path: str,
+    size_px: int,
+    cps: List[int],
+    font: Optional[ImageFont.FreeTypeFont] = None,
+    glyph_cache: Optional[GlyphCache] = None,
+    workers: int = 1,
+    progress_cb: Optional[Callable[[int, int], None]] = None,
+    should_cancel: Optional[Callable[[], bool]] = None,
+    stats: Optional[GenerationStats] = None,
+) -> Dict[int, CharBitmap]:
+    tables = buildGlyphTables(
+        font_path, [size_px], cps, fonts={size_px: font} if font is not None else None,
+        glyph_cache=glyph_cache, workers=workers, progress_cb=progress_cb, should_cancel=should_cancel, stats=stats,
+    )
+    return tables[int(size_px)]
+
+
+def _composeCoverage(
+    plan: PagePlan,
+    index: int,
+    should_cancel: Optional[Callable[[], bool]] = None,
+) -> Tuple[PageCompositor, int, List[int], List[str]]:
+    batch = plan.batches[index]
+    num_cols = plan.num_cols
+    frame_w = plan.frame_w
+    frame_h = plan.frame_h
+    num_rows = _pageRows(plan, batch)
+    compositor = PageCompositor(num_cols * frame_w, num_rows * frame_h)
+    widths: List[int] = []
+    lines: List[str] = []
+    top_padding = int(plan.padding / 2)
+    offset_y = int(top_padding + int(plan.center_offset) - int(plan.baseline_offset))
+    i = 0
+    for r in range(num_rows):
+        if should_cancel and should_cancel():
+            raise RuntimeError("Cancelled")
+        line_chars: List[str] = []
+        for c in range(num_cols):
+            if i >= len(batch):
+                break
+            cp = batch[i]
+            cb = plan.glyphs.get(cp)
+            if cb is None:
+                i += 1
+                continue
+            x = c * frame_w + _cellOffsetX(plan, cb)
+            y = r * frame_h + offset_y
+            if plan.vertical:
+                cb = rotateCharBitmap(cb)
+            widths.append(cb.bbox_w if plan.vertical else cb.width_adv)
+            line_chars.append(chr(cp))
+            compositor.blit(cb.mask, x + cb.offset_x, y + cb.offset_y)
+            i += 1
+        lines.append("".join(line_chars))
+    if compositor.overlaps:
+        logger.info(f"gen: {plan.page_names[index]}: {compositor.overlaps} overlapping glyphs blended")
+    return compositor, num_rows, widths, lines
+
+
+def composePage(
+    plan: PagePlan,
+    index: int,
+    should_cancel: Optional[Callable[[], bool]] = None,
+) -> PageLayout:
+    compositor, num_rows, widths, lines = _composeCoverage(plan, index, should_cancel)
+    return PageLayout(
+        name=plan.page_names[index],
+        num_cols=plan.num_cols,
+        num_rows=num_rows,
+        frame_w=plan.frame_w,
+        frame_h=plan.frame_h,
+        image=compositor.toImage(),
+        lines=lines,
+        widths=widths,
+    )
+
+
+def composePageCoverage(
+    plan: PagePlan,
+    index: int,
+    should_cancel: Optional[Callable[[], bool]] = None,
+) -> Tuple[object, int, int]:
+    compositor = _composeCoverage(plan, index, should_cancel)[0]
+    return compositor.toBuffer(), compositor.width, compositor.height
+
+
+def describePage(plan: PagePlan, index: int) -> PageLayout:
+    batch = plan.batches[index]
+    num_cols = plan.num_cols
+    num_rows = _pageRows(plan, batch)
+    widths: List[int] = []
+    lines: List[str] = []
+    for r in range(num_rows):
+        line_chars: List[str] = []
+        for cp in batch[r * num_cols:(r + 1) * num_cols]:
+            cb = plan.glyphs.get(cp)
+            if cb is None:
+                continue
+            widths.append(cb.bbox_h if plan.vertical else cb.width_adv)
+            line_chars.append(chr(cp))
+        lines.append("".join(line_chars))
+    return PageLayout(
+        name=plan.page_names[index],
+        num_cols=num_cols,
+        num_rows=num_rows,
+        frame_w=plan.frame_w,
+        frame_h=plan.frame_h,
+        image=None,
+        lines=lines,
+        widths=widths,
+    )
+
+
+def pageSize(plan: PagePlan, index: int) -> Tuple[int, int]:
+    return plan.num_cols * plan.frame_w, _pageRows(plan, plan.batches[index]) * plan.frame_h
+
+
+def _checkGlyphBudget(count: int, sizes: List[int], max_memory_mb: Optional[float]) -> None:
+    needed = residentBytes() + sum(estimateGlyphTableBytes(count, s) for s in sizes)
+    advice = "lower the size or the number of codepoints (e.g. with a preset)"
+    if len(sizes) > 1:
+        advice += "; the 2x redir modes also rasterize every glyph at double size"
+    checkMemoryBudget(max_memory_mb, needed, f"rasterizing {count} glyphs at {'/'.join(str(s) for s in sizes)}px", advice)
+
+
+def _pageRows(plan: PagePlan, batch: List[int]) -> int:
+    if plan.fixed_rows:
+        return plan.fixed_rows
+    return math.ceil(len(batch) / plan.num_cols) if len(batch) else 1
+
+
+def _cellOffsetX(plan: PagePlan, cb: CharBitmap) -> int:
+    w = cb.bbox_h if plan.vertical else cb.width_adv
+    return int((plan.frame_w / 2.0) - (w / 2.0))
+
+
+def iterPages(
+    plan: PagePlan,
+    should_cancel: Optional[Callable[[], bool]] = None,
+    release_glyphs: bool = False,
+    reuse: Optional[Callable[[int], bool]] = None,
+    stats: Optional[GenerationStats] = None,
+) -> Iterator[PageLayout]:
+    for page_index, batch in enumerate(plan.batches):
+        if should_cancel and should_cancel():
+            raise RuntimeError("Cancelled")
+        if reuse and reuse(page_index):
+            page = describePage(plan, page_index)
+        else:
+            with timeStage(stats, "compose"):
+                page = composePage(plan, page_index, should_cancel)
+        if stats is not None:
+            stats.pages.append((page.num_cols * page.frame_w, page.num_rows * page.frame_h))
+        if release_glyphs:
+            for cp in batch:
+                plan.glyphs.pop(cp, None)
+        yield page
+        if should_cancel and should_cancel():
+            raise RuntimeError("Cancelled")
+
+
+def planPages(
     font_path: str,
     size_px: int,
     padding: int,
@@ -65,25 +416,39 @@ def generatePages(
     right_overlap: int = 0,
     advance_extra: int = 0,
     should_cancel: Optional[Callable[[], bool]] = None,
-) -> Tuple[FontMetrics, List[PageLayout]]:
+    glyph_cache: Optional[GlyphCache] = None,
+    workers: int = 1,
+    glyph_table: Optional[Dict[int, CharBitmap]] = None,
+    stats: Optional[GenerationStats] = None,
+    max_memory_mb: Optional[float] = None,
+) -> Tuple[FontMetrics, PagePlan]:
     os.makedirs(save_dir, exist_ok=True)
-    font = loadFont(font_path, size_px)
-    cps = codepoints if codepoints is not None else getFontCmapCodepoints(font_path)
-    cps, suggested_name = _filterCodepointsByPreset(cps, preset)
+    with timeStage(stats, "font_load"):
+        font = loadFont(font_path, size_px)
+        baseline, top, line_spacing = measureFontMetrics(font)
+    if codepoints is None:
+        with timeStage(stats, "cmap"):
+            codepoints = getFontCmap(font_path)
+    cps, suggested_name = _filterCodepointsByPreset(codepoints, preset)
     if group_name == "main":
         group_name = suggested_name
-    baseline, top, line_spacing = measureFontMetrics(font)
-    ascent = baseline - top
-    descent = line_spacing - baseline
     logger.info(f"gen: path={font_path}, size={size_px}, pad={padding}")
     logger.info(f"tune: center={center_offset}, top={top_offset}, baseline={baseline_offset}")
     left_overlap = int(max(0, left_overlap))
     right_overlap = int(max(0, right_overlap))
     advance_extra = int(max(0, advance_extra))
-    max_w, max_h = computeGlobalBoundsByMeasure(font, cps)
+    if glyph_table is not None:
+        table = dict(glyph_table)
+    else:
+        _checkGlyphBudget(len(cps), [size_px], max_memory_mb)
+        table = buildGlyphTable(
+            font_path, size_px, cps, font=font, glyph_cache=glyph_cache, workers=workers,
+            progress_cb=progress_cb, should_cancel=should_cancel, stats=stats,
+        )
+    with timeStage(stats, "bounds"):
+        max_w, max_h = computeGlobalBoundsFromTable(table)
     frame_w = math.ceil((max_w + padding) / 4.0) * 4
     frame_h = math.ceil((max_h + padding) / 4.0) * 4
-    pages: List[PageLayout] = []
     total_chars = len(cps)
     col = fixed_cols if fixed_cols else min(chooseColumns(total_chars), max(1, max_texture_size // frame_w))
     max_rows_per_page = fixed_rows if fixed_rows else max(1, max_texture_size // frame_h)
@@ -92,67 +457,23 @@ def generatePages(
         capacity = max(1, int(max_chars_per_page))
     batches: List[List[int]] = []
     for i in range(0, total_chars, capacity):
-        batches.append(cps[i:i + capacity])
-    processed = 0
-    for page_index, batch in enumerate(batches):
-        if should_cancel and should_cancel():
-            raise RuntimeError("Cancelled")
-        page_name = group_name if len(batches) == 1 else f"{group_name} {page_index + 1}"
-        num_cols = col
-        num_rows = math.ceil(len(batch) / num_cols) if len(batch) else 1
-        if fixed_rows:
-            num_rows = fixed_rows
-        page_img = Image.new("RGBA", (num_cols * frame_w, num_rows * frame_h), (0, 0, 0, 0))
-        widths: List[int] = []
-        lines: List[str] = []
-        i = 0
-        for r in range(num_rows):
-            if should_cancel and should_cancel():
-                raise RuntimeError("Cancelled")
-            line_chars: List[str] = []
-            for c in range(num_cols):
-                if i >= len(batch):
-                    break
-                cp = batch[i]
-                ch = safeCharFromCodepoint(cp)
-                if not ch:
-                    i += 1
-                    continue
-                cb = renderCharBitmap(font, ch)
-                img = cb.image
-                if vertical:
-                    img = img.rotate(90, expand=True)
-                adv_w = cb.width_adv if not vertical else cb.bbox_h
-                widths.append(adv_w)
-                line_chars.append(ch)
-                w = cb.width_adv if not vertical else img.size[0]
-                h = cb.bbox_h if not vertical else img.size[1]
-                offset_x = int((frame_w / 2.0) - (w / 2.0))
-                top_padding = int(padding / 2)
-                offset_y = int(top_padding + int(center_offset) - int(baseline_offset))
-                x = c * frame_w + offset_x
-                y = r * frame_h + offset_y
-                page_img.alpha_composite(img, (x, y))
-                i += 1
-            lines.append("".join(line_chars))
-        pages.append(PageLayout(
-            name=page_name,
-            num_cols=num_cols,
-            num_rows=num_rows,
-            frame_w=frame_w,
-            frame_h=frame_h,
-            image=page_img,
-            lines=lines,
-            widths=widths,
-        ))
-        processed += len(batch)
-        if progress_cb:
-            try:
-                progress_cb(processed, total_chars)
-            except Exception:
-                pass
-        if should_cancel and should_cancel():
-            raise RuntimeError("Cancelled")
+        batches.append(list(cps[i:i + capacity]))
+    page_names: List[str] = []
+    for page_index in range(len(batches)):
+        page_names.append(group_name if len(batches) == 1 else f"{group_name} {page_index + 1}")
+    plan = PagePlan(
+        page_names=page_names,
+        batches=batches,
+        num_cols=col,
+        fixed_rows=fixed_rows,
+        frame_w=frame_w,
+        frame_h=frame_h,
+        padding=padding,
+        vertical=vertical,
+        center_offset=center_offset,
+        baseline_offset=baseline_offset,
+        glyphs=table,
+    )
     metrics = FontMetrics(
         ascent=baseline,
         descent=line_spacing - baseline,
@@ -163,10 +484,10 @@ def generatePages(
         right_overlap=right_overlap,
         advance_extra=advance_extra,
     )
-    return metrics, pages
+    return metrics, plan
 
 
-def safeGeneratePages(
+def generatePages(
     font_path: str,
     size_px: int,
     padding: int,
@@ -187,22 +508,16 @@ def safeGeneratePages(
     right_overlap: int = 0,
     advance_extra: int = 0,
     should_cancel: Optional[Callable[[], bool]] = None,
+    glyph_cache: Optional[GlyphCache] = None,
+    workers: int = 1,
+    glyph_table: Optional[Dict[int, CharBitmap]] = None,
+    stats: Optional[GenerationStats] = None,
+    profile: Optional[str] = None,
+    max_memory_mb: Optional[float] = None,
 ) -> Tuple[FontMetrics, List[PageLayout]]:
-    try:
-        logger.info(f"safe gen: {font_path}")
-        if not font_path or not os.path.exists(font_path):
-            raise ValueError(f"font not found: {font_path}")
-        if size_px <= 0:
-            raise ValueError(f"size must > 0: {size_px}")
-        if padding < 0:
-            raise ValueError(f"padding must >= 0: {padding}")
-        center_offset = max(-100, min(100, center_offset))
-        top_offset = max(-100, min(100, top_offset))
-        baseline_offset = max(-100, min(100, baseline_offset))
-        left_overlap = max(0, min(64, int(left_overlap)))
-        right_overlap = max(0, min(64, int(right_overlap)))
-        advance_extra = max(0, min(128, int(advance_extra)))
-        return generatePages(
+    with trackMemory(stats), ProfileRun(profile, os.path.join(save_dir, group_name)) as prof:
+        t0 = time.perf_counter()
+        metrics, plan = planPages(
             font_path=font_path,
             size_px=size_px,
             padding=padding,
@@ -223,33 +538,350 @@ def safeGeneratePages(
             right_overlap=right_overlap,
             advance_extra=advance_extra,
             should_cancel=should_cancel,
+            glyph_cache=glyph_cache,
+            workers=workers,
+            glyph_table=glyph_table,
+            stats=stats,
+            max_memory_mb=max_memory_mb,
         )
+        page_bytes = sum(w * h for w, h in (pageSize(plan, i) for i in range(len(plan.batches))))
+        checkMemoryBudget(max_memory_mb, residentBytes() + page_bytes, f"keeping {len(plan.batches)} pages", "export with generateAndSave, which writes pages as they are composed")
+        pages = list(iterPages(plan, should_cancel=should_cancel, stats=stats))
+        prof.describe(font_path, size_px, sum(len(page.widths) for page in pages))
+        if stats is not None:
+            stats.total_seconds += time.perf_counter() - t0
+        return metrics, pages
+
+
+def iterGeneratePages(
+    font_path: str,
+    size_px: int,
+    padding: int,
+    save_dir: str,
+    group_name: str = "main",
+    codepoints: Optional[List[int]] = None,
+    max_texture_size: int = 4096,
+    progress_cb: Optional[Callable[[int, int], None]] = None,
+    vertical: bool = False,
+    max_chars_per_page: Optional[int] = None,
+    preset: Optional[str] = None,
+    fixed_cols: Optional[int] = None,
+    fixed_rows: Optional[int] = None,
+    center_offset: int = 0,
+    top_offset: int = 0,
+    baseline_offset: int = 0,
+    left_overlap: int = 0,
+    right_overlap: int = 0,
+    advance_extra: int = 0,
+    should_cancel: Optional[Callable[[], bool]] = None,
+    glyph_cache: Optional[GlyphCache] = None,
+    workers: int = 1,
+    glyph_table: Optional[Dict[int, CharBitmap]] = None,
+    stats: Optional[GenerationStats] = None,
+    release_glyphs: bool = True,
+) -> Tuple[FontMetrics, Iterator[PageLayout]]:
+    metrics, plan = planPages(
+        font_path=font_path,
+        size_px=size_px,
+        padding=padding,
+        save_dir=save_dir,
+        group_name=group_name,
+        codepoints=codepoints,
+        max_texture_size=max_texture_size,
+        progress_cb=progress_cb,
+        vertical=vertical,
+        max_chars_per_page=max_chars_per_page,
+        preset=preset,
+        fixed_cols=fixed_cols,
+        fixed_rows=fixed_rows,
+        center_offset=center_offset,
+        top_offset=top_offset,
+        baseline_offset=baseline_offset,
+        left_overlap=left_overlap,
+        right_overlap=right_overlap,
+        advance_extra=advance_extra,
+        should_cancel=should_cancel,
+        glyph_cache=glyph_cache,
+        workers=workers,
+        glyph_table=glyph_table,
+        stats=stats,
+    )
+    return metrics, iterPages(plan, should_cancel=should_cancel, release_glyphs=release_glyphs, stats=stats)
+
+
+def _checkGenerateArgs(font_path: str, size_px: int, padding: int) -> None:
+    if not font_path or not os.path.exists(splitFontPath(font_path)[0]):
+        raise ValueError(f"font not found: {font_path}")
+    if size_px <= 0:
+        raise ValueError(f"size must > 0: {size_px}")
+    if padding < 0:
+        raise ValueError(f"padding must >= 0: {padding}")
+
+
+def _runWithOffsetFallback(run: Callable[..., T], **kwargs) -> T:
+    font_path = kwargs["font_path"]
+    size_px = kwargs["size_px"]
+    padding = kwargs["padding"]
+    try:
+        logger.info(f"safe gen: {font_path}")
+        _checkGenerateArgs(font_path, size_px, padding)
+        kwargs["center_offset"] = max(-100, min(100, kwargs.get("center_offset", 0)))
+        kwargs["top_offset"] = max(-100, min(100, kwargs.get("top_offset", 0)))
+        kwargs["baseline_offset"] = max(-100, min(100, kwargs.get("baseline_offset", 0)))
+        kwargs["left_overlap"] = max(0, min(64, int(kwargs.get("left_overlap", 0))))
+        kwargs["right_overlap"] = max(0, min(64, int(kwargs.get("right_overlap", 0))))
+        kwargs["advance_extra"] = max(0, min(128, int(kwargs.get("advance_extra", 0))))
+        return run(**kwargs)
     except Exception as e:
-        if top_offset != 0 or baseline_offset != 0:
+        if kwargs.get("top_offset", 0) != 0 or kwargs.get("baseline_offset", 0) != 0:
             try:
-                return generatePages(
-                    font_path=font_path,
-                    size_px=size_px,
-                    padding=padding,
-                    save_dir=save_dir,
-                    group_name=group_name,
-                    codepoints=codepoints,
-                    max_texture_size=max_texture_size,
-                    progress_cb=progress_cb,
-                    vertical=vertical,
-                    max_chars_per_page=max_chars_per_page,
-                    preset=preset,
-                    fixed_cols=fixed_cols,
-                    fixed_rows=fixed_rows,
-                    center_offset=0,
-                    top_offset=0,
-                    baseline_offset=0,
-                    left_overlap=left_overlap,
-                    right_overlap=right_overlap,
-                    advance_extra=advance_extra,
-                    should_cancel=should_cancel,
-                )
+                kwargs["center_offset"] = 0
+                kwargs["top_offset"] = 0
+                kwargs["baseline_offset"] = 0
+                return run(**kwargs)
             except Exception:
                 raise e
         else:
-            raise e
\ No newline at end of file
+            raise e
+
+
+def safeGeneratePages(
+    font_path: str,
+    size_px: int,
+    padding: int,
+    save_dir: str,
+    group_name: str = "main",
+    codepoints: Optional[List[int]] = None,
+    max_texture_size: int = 4096,
+    progress_cb: Optional[Callable[[int, int], None]] = None,
+    vertical: bool = False,
+    max_chars_per_page: Optional[int] = None,
+    preset: Optional[str] = None,
+    fixed_cols: Optional[int] = None,
+    fixed_rows: Optional[int] = None,
+    center_offset: int = 0,
+    top_offset: int = 0,
+    baseline_offset: int = 0,
+    left_overlap: int = 0,
+    right_overlap: int = 0,
+    advance_extra: int = 0,
+    should_cancel: Optional[Callable[[], bool]] = None,
+    glyph_cache: Optional[GlyphCache] = None,
+    workers: int = 1,
+    glyph_table: Optional[Dict[int, CharBitmap]] = None,
+    stats: Optional[GenerationStats] = None,
+    profile: Optional[str] = None,
+    max_memory_mb: Optional[float] = None,
+) -> Tuple[FontMetrics, List[PageLayout]]:
+    return _runWithOffsetFallback(
+        generatePages,
+        font_path=font_path,
+        size_px=size_px,
+        padding=padding,
+        save_dir=save_dir,
+        group_name=group_name,
+        codepoints=codepoints,
+        max_texture_size=max_texture_size,
+        progress_cb=progress_cb,
+        vertical=vertical,
+        max_chars_per_page=max_chars_per_page,
+        preset=preset,
+        fixed_cols=fixed_cols,
+        fixed_rows=fixed_rows,
+        center_offset=center_offset,
+        top_offset=top_offset,
+        baseline_offset=baseline_offset,
+        left_overlap=left_overlap,
+        right_overlap=right_overlap,
+        advance_extra=advance_extra,
+        should_cancel=should_cancel,
+        glyph_cache=glyph_cache,
+        workers=workers,
+        glyph_table=glyph_table,
+        stats=stats,
+        profile=profile,
+        max_memory_mb=max_memory_mb,
+    )
+
+
+def safePlanPages(
+    font_path: str,
+    size_px: int,
+    padding: int,
+    save_dir: str,
+    group_name: str = "main",
+    codepoints: Optional[List[int]] = None,
+    max_texture_size: int = 4096,
+    progress_cb: Optional[Callable[[int, int], None]] = None,
+    vertical: bool = False,
+    max_chars_per_page: Optional[int] = None,
+    preset: Optional[str] = None,
+    fixed_cols: Optional[int] = None,
+    fixed_rows: Optional[int] = None,
+    center_offset: int = 0,
+    top_offset: int = 0,
+    baseline_offset: int = 0,
+    left_overlap: int = 0,
+    right_overlap: int = 0,
+    advance_extra: int = 0,
+    should_cancel: Optional[Callable[[], bool]] = None,
+    glyph_cache: Optional[GlyphCache] = None,
+    workers: int = 1,
+    glyph_table: Optional[Dict[int, CharBitmap]] = None,
+    stats: Optional[GenerationStats] = None,
+) -> Tuple[FontMetrics, PagePlan]:
+    return _runWithOffsetFallback(
+        planPages,
+        font_path=font_path,
+        size_px=size_px,
+        padding=padding,
+        save_dir=save_dir,
+        group_name=group_name,
+        codepoints=codepoints,
+        max_texture_size=max_texture_size,
+        progress_cb=progress_cb,
+        vertical=vertical,
+        max_chars_per_page=max_chars_per_page,
+        preset=preset,
+        fixed_cols=fixed_cols,
+        fixed_rows=fixed_rows,
+        center_offset=center_offset,
+        top_offset=top_offset,
+        baseline_offset=baseline_offset,
+        left_overlap=left_overlap,
+        right_overlap=right_overlap,
+        advance_extra=advance_extra,
+        should_cancel=should_cancel,
+        glyph_cache=glyph_cache,
+        workers=workers,
+        glyph_table=glyph_table,
+        stats=stats,
+    )
+
+
+def safeIterGeneratePages(
+    font_path: str,
+    size_px: int,
+    padding: int,
+    save_dir: str,
+    group_name: str = "main",
+    codepoints: Optional[List[int]] = None,
+    max_texture_size: int = 4096,
+    progress_cb: Optional[Callable[[int, int], None]] = None,
+    vertical: bool = False,
+    max_chars_per_page: Optional[int] = None,
+    preset: Optional[str] = None,
+    fixed_cols: Optional[int] = None,
+    fixed_rows: Optional[int] = None,
+    center_offset: int = 0,
+    top_offset: int = 0,
+    baseline_offset: int = 0,
+    left_overlap: int = 0,
+    right_overlap: int = 0,
+    advance_extra: int = 0,
+    should_cancel: Optional[Callable[[], bool]] = None,
+    glyph_cache: Optional[GlyphCache] = None,
+    workers: int = 1,
+    glyph_table: Optional[Dict[int, CharBitmap]] = None,
+    stats: Optional[GenerationStats] = None,
+    release_glyphs: bool = True,
+) -> Tuple[FontMetrics, Iterator[PageLayout]]:
+    return _runWithOffsetFallback(
+        iterGeneratePages,
+        font_path=font_path,
+        size_px=size_px,
+        padding=padding,
+        save_dir=save_dir,
+        group_name=group_name,
+        codepoints=codepoints,
+        max_texture_size=max_texture_size,
+        progress_cb=progress_cb,
+        vertical=vertical,
+        max_chars_per_page=max_chars_per_page,
+        preset=preset,
+        fixed_cols=fixed_cols,
+        fixed_rows=fixed_rows,
+        center_offset=center_offset,
+        top_offset=top_offset,
+        baseline_offset=baseline_offset,
+        left_overlap=left_overlap,
+        right_overlap=right_overlap,
+        advance_extra=advance_extra,
+        should_cancel=should_cancel,
+        glyph_cache=glyph_cache,
+        workers=workers,
+        glyph_table=glyph_table,
+        stats=stats,
+        release_glyphs=release_glyphs,
+    )
+
+
+def safePlanPageSizes(
+    font_path: str,
+    sizes: List[int],
+    padding: int,
+    save_dir: str,
+    group_name: str = "main",
+    codepoints: Optional[List[int]] = None,
+    max_texture_size: int = 4096,
+    progress_cb: Optional[Callable[[int, int], None]] = None,
+    vertical: bool = False,
+    max_chars_per_page: Optional[int] = None,
+    preset: Optional[str] = None,
+    center_offset: int = 0,
+    top_offset: int = 0,
+    baseline_offset: int = 0,
+    left_overlap: int = 0,
+    right_overlap: int = 0,
+    advance_extra: int = 0,
+    should_cancel: Optional[Callable[[], bool]] = None,
+    glyph_cache: Optional[GlyphCache] = None,
+    workers: int = 1,
+    stats: Optional[GenerationStats] = None,
+    max_memory_mb: Optional[float] = None,
+) -> List[Tuple[FontMetrics, PagePlan]]:
+    for size_px in sizes:
+        _checkGenerateArgs(font_path, size_px, padding)
+    if codepoints is None:
+        with timeStage(stats, "cmap"):
+            codepoints = getFontCmap(font_path)
+    cps, suggested_name = _filterCodepointsByPreset(codepoints, preset)
+    if group_name == "main":
+        group_name = suggested_name
+    _checkGlyphBudget(len(cps), sizes, max_memory_mb)
+    tables = buildGlyphTables(
+        font_path, sizes, cps, glyph_cache=glyph_cache, workers=workers,
+        progress_cb=progress_cb, should_cancel=should_cancel, stats=stats,
+    )
+    plans: List[Tuple[FontMetrics, PagePlan]] = []
+    fixed_cols: Optional[int] = None
+    fixed_rows: Optional[int] = None
+    for size_px in sizes:
+        metrics, plan = _runWithOffsetFallback(
+            planPages,
+            font_path=font_path,
+            size_px=size_px,
+            padding=padding,
+            save_dir=save_dir,
+            group_name=group_name,
+            codepoints=cps,
+            max_texture_size=max_texture_size,
+            vertical=vertical,
+            max_chars_per_page=max_chars_per_page,
+            fixed_cols=fixed_cols,
+            fixed_rows=fixed_rows,
+            center_offset=center_offset,
+            top_offset=top_offset,
+            baseline_offset=baseline_offset,
+            left_overlap=left_overlap,
+            right_overlap=right_overlap,
+            advance_extra=advance_extra,
+            should_cancel=should_cancel,
+            glyph_table=tables[int(size_px)],
+            stats=stats,
+        )
+        plans.append((metrics, plan))
+        if fixed_cols is None and plan.batches:
+            fixed_cols = plan.num_cols
+            fixed_rows = _pageRows(plan, plan.batches[0])
+    return plans
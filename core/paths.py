@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import os
+import sys
+from typing import Optional, Tuple
+
+
+def splitFontPath(font_path: str) -> Tuple[str, Optional[int]]:
+    index = None
+    path = font_path
+    if "|index=" in font_path:
+        try:
+            path, idx_str = font_path.split("|index=", 1)
+            index = int(idx_str.strip())
+        except Exception:
+            path = font_path
+            index = None
+    return path, index
+
+
+def fontFingerprint(font_path: str) -> Tuple[str, int, int, int]:
+    path, index = splitFontPath(font_path)
+    st = os.stat(path)
+    return os.path.normcase(os.path.abspath(path)), int(index or 0), int(st.st_size), int(st.st_mtime_ns)
+
+
+def userCacheDir(*parts: str) -> str:
+    if sys.platform.startswith("win"):
+        root = os.environ.get("LOCALAPPDATA") or os.path.expanduser(r"~\AppData\Local")
+    elif sys.platform == "darwin":
+        root = os.path.expanduser("~/Library/Caches")
+    else:
+        root = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(root, "texture_font_factory", *parts)
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import os
+import sys
+import cProfile
+import pstats
+import logging
+import threading
+from collections import Counter
+from typing import List, Optional
+
+from .paths import splitFontPath
+
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ("cprofile", "sample", "all")
+
+
+def _frameName(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class _StackSampler(threading.Thread):
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self._stop_event = threading.Event()
+        self._ignored = set(sys._current_frames()) - {thread_id}
+
+    def run(self) -> None:
+        self._ignored.add(threading.get_ident())
+        while not self._stop_event.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident in self._ignored:
+                    continue
+                stack: List[str] = []
+                while frame is not None:
+                    stack.append(_frameName(frame))
+                    frame = frame.f_back
+                if stack:
+                    if ident != self.thread_id:
+                        stack.append("[thread]")
+                    self.counts[";".join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+def _sanitizeTag(s: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in s).strip("_") or "run"
+
+
+def profileTag(font_path: str, size_px: int, codepoint_count: int) -> str:
+    path, index = splitFontPath(font_path)
+    name = os.path.splitext(os.path.basename(path))[0]
+    if index:
+        name += f"-{index}"
+    return _sanitizeTag(f"{name}-{int(size_px)}px-{int(codepoint_count)}cp")
+
+
+class ProfileRun:
+    def __init__(self, mode: Optional[str], base_path: str, interval: float = 0.005):
+        mode = (mode or "").strip().lower() or None
+        if mode is not None and mode not in PROFILE_MODES:
+            raise ValueError(f"profile must be one of {', '.join(PROFILE_MODES)}: {mode}")
+        self.mode = mode
+        self.base_path = base_path
+        self.interval = interval
+        self.tag = "run"
+        self.paths: List[str] = []
+        self._profiler: Optional[cProfile.Profile] = None
+        self._sampler: Optional[_StackSampler] = None
+
+    def describe(self, font_path: str, size_px: int, codepoint_count: int) -> None:
+        self.tag = profileTag(font_path, size_px, codepoint_count)
+
+    def __enter__(self) -> "ProfileRun":
+        if self.mode in ("sample", "all"):
+            self._sampler = _StackSampler(threading.get_ident(), self.interval)
+            self._sampler.start()
+        if self.mode in ("cprofile", "all"):
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if self._profiler is not None:
+            self._profiler.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+        if exc_type is None and self.mode is not None:
+            try:
+                self._write()
+            except Exception as e:
+                logger.warning(f"profile: could not write results ({e})")
+        return False
+
+    def _write(self) -> None:
+        prefix = f"{self.base_path}.profile-{self.tag}"
+        if self._profiler is not None:
+            self._profiler.dump_stats(f"{prefix}.pstats")
+            with open(f"{prefix}.pstats.txt", "w", encoding="utf-8") as f:
+                stats = pstats.Stats(self._profiler, stream=f)
+                stats.sort_stats("cumulative").print_stats(60)
+            self.paths += [f"{prefix}.pstats", f"{prefix}.pstats.txt"]
+        if self._sampler is not None:
+            with open(f"{prefix}.collapsed", "w", encoding="utf-8") as f:
+                for stack, count in self._sampler.counts.most_common():
+                    f.write(f"{stack} {count}\n")
+            self.paths.append(f"{prefix}.collapsed")
+        logger.info(f"profile: wrote {', '.join(self.paths)}")
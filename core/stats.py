@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from ..types.models import CharBitmap, GenerationStats
+from .memory import MemoryMonitor
+
+
+STAGE_ORDER = ("font_load", "cmap", "rasterize", "bounds", "compose", "png", "ini")
+
+_MB = 1024 * 1024
+
+_monitors: Dict[int, MemoryMonitor] = {}
+
+
+def addStageTime(stats: Optional[GenerationStats], stage: str, seconds: float) -> None:
+    if stats is not None:
+        stats.stage_seconds[stage] = stats.stage_seconds.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def trackMemory(stats: Optional[GenerationStats]) -> Iterator[None]:
+    if stats is None or id(stats) in _monitors:
+        yield
+        return
+    monitor = MemoryMonitor()
+    _monitors[id(stats)] = monitor
+    monitor.start()
+    try:
+        yield
+    finally:
+        _monitors.pop(id(stats), None)
+        monitor.stop()
+        for stage, value in monitor.stage_peaks.items():
+            stats.stage_peak_mb[stage] = max(stats.stage_peak_mb.get(stage, 0.0), round(value / _MB, 1))
+        stats.peak_rss_mb = max(stats.peak_rss_mb, round(monitor.peak / _MB, 1))
+
+
+@contextmanager
+def memoryStage(stats: Optional[GenerationStats], stage: str) -> Iterator[None]:
+    monitor = _monitors.get(id(stats)) if stats is not None else None
+    if monitor is None:
+        yield
+        return
+    previous = monitor.enter(stage)
+    try:
+        yield
+    finally:
+        monitor.leave(previous)
+
+
+@contextmanager
+def timeStage(stats: Optional[GenerationStats], stage: str) -> Iterator[None]:
+    if stats is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        with memoryStage(stats, stage):
+            yield
+    finally:
+        addStageTime(stats, stage, time.perf_counter() - t0)
+
+
+def countGlyphs(stats: Optional[GenerationStats], table: Dict[int, CharBitmap]) -> None:
+    if stats is None:
+        return
+    stats.glyphs += len(table)
+    stats.empty_glyphs += sum(1 for cb in table.values() if cb.mask.size[1] <= 1 and cb.mask.getbbox() is None)
+
+
+def formatStats(stats: GenerationStats) -> str:
+    stages = [s for s in STAGE_ORDER if s in stats.stage_seconds] + sorted(set(stats.stage_seconds) - set(STAGE_ORDER))
+    times = ", ".join(f"{s} {stats.stage_seconds[s]:.2f}s" for s in stages)
+    sizes = sorted(set(stats.pages))
+    dims = ", ".join(f"{w}x{h}" for w, h in sizes[:3]) + (" …" if len(sizes) > 3 else "")
+    lines = [
+        f"{stats.glyphs} glyphs ({stats.empty_glyphs} empty, {stats.cache_hits} cached)",
+        f"{len(stats.pages)} pages{f' ({dims})' if dims else ''}, {stats.pages_reused} reused",
+        f"{stats.files_written} files, {stats.bytes_written / (1024 * 1024):.1f} MB written",
+        f"{stats.total_seconds:.2f}s total: {times}" if times else f"{stats.total_seconds:.2f}s total",
+    ]
+    if stats.peak_rss_mb:
+        peaks = sorted(stats.stage_peak_mb.items(), key=lambda kv: -kv[1])[:3]
+        lines.append(f"peak memory {stats.peak_rss_mb:.0f} MB ({', '.join(f'{s} {mb:.0f}' for s, mb in peaks)})")
+    return "\n".join(lines)
@@ -1,18 +1,67 @@
 from __future__ import annotations
 import os
 import logging
+import threading
 from typing import Dict, Optional
 logger = logging.getLogger(__name__)
 from PySide6.QtCore import Qt, QThread, Signal, QTimer, QSize
-from PySide6.QtGui import QPixmap, QImage
+from PySide6.QtGui import QPixmap, QImage, qRgba
 from PySide6.QtWidgets import QApplication, QFileDialog, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QDialog, QProgressBar, QListWidget, QListWidgetItem, QScrollArea
 from qfluentwidgets import FluentWindow, ComboBox, LineEdit, SpinBox, PrimaryPushButton, InfoBar, setTheme, Theme, FluentIcon, NavigationItemPosition, ToolButton, CheckBox, setCustomStyleSheet
 from PIL.ImageQt import ImageQt
 from PIL import Image
-from ..core.fonts import enumerateFontVariantsWithProgress as enumerate_font_variants_with_progress, loadFont as load_font
+from ..core.fonts import enumerateFontVariantsWithProgress as enumerate_font_variants_with_progress, loadFont as load_font, getFontCmap as get_font_cmap
 from ..core.metrics import measureFontMetrics as measure_font_metrics
-from ..core.glyphs import renderCharBitmap as render_char_bitmap
+from ..core.glyphs import renderCharBitmap as render_char_bitmap, charBitmapToRGBA as char_bitmap_to_rgba
 from ..core.export import generateAndSave as generate_and_save
+from ..core.cache import GlyphCache
+from ..core.pages import buildGlyphTable as build_glyph_table
+from ..core.paths import userCacheDir as user_cache_dir, fontFingerprint as font_fingerprint
+from ..core.stats import formatStats as format_stats
+from ..types.models import GenerationStats
+_glyph_cache: GlyphCache | None = None
+_preview_glyph_tables: dict = {}
+
+def shared_glyph_cache() -> GlyphCache:
+    global _glyph_cache
+    if _glyph_cache is None:
+        _glyph_cache = GlyphCache(cache_dir=user_cache_dir('glyphs'))
+    return _glyph_cache
+
+def preview_glyph_table(font_path: str, size: int, progress_cb=None, should_cancel=None):
+    key = (font_fingerprint(font_path), int(size))
+    entry = _preview_glyph_tables.get(key)
+    if entry is None:
+        cps = get_font_cmap(font_path)
+        table = build_glyph_table(font_path, int(size), cps, glyph_cache=shared_glyph_cache(), progress_cb=progress_cb, should_cancel=should_cancel)
+        entry = (cps, table)
+        while len(_preview_glyph_tables) >= 2:
+            _preview_glyph_tables.pop(next(iter(_preview_glyph_tables)))
+        _preview_glyph_tables[key] = entry
+    return entry
+PREVIEW_KEEP_PAGES = 2
+
+PREVIEW_BACKGROUND_STYLE = 'background-color: rgb(40, 40, 40);'
+_COVERAGE_COLOR_TABLE = [qRgba(255, 255, 255, a) for a in range(256)]
+
+def coverage_to_qimage(buf, w: int, h: int) -> QImage:
+    qimg = QImage(buf, w, h, w, QImage.Format_Indexed8)
+    qimg.setColorTable(_COVERAGE_COLOR_TABLE)
+    return qimg.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+
+def request_preview_pages(worker, state: dict):
+    idx = state['index']
+    for i in list(state['images']):
+        if abs(i - idx) > PREVIEW_KEEP_PAGES:
+            del state['images'][i]
+    if worker is not None:
+        worker.request_pages([i for i in (idx, idx + 1, idx - 1) if 0 <= i < state['count'] and i not in state['images']])
+
+def accept_preview_page(state: dict, index: int, image: QImage) -> bool:
+    if abs(index - state['index']) > PREVIEW_KEEP_PAGES:
+        return False
+    state['images'][index] = QPixmap.fromImage(image)
+    return index == state['index']
 
 class GenerateWorker(QThread):
     finishedOk = Signal(str)
@@ -36,6 +85,7 @@ class GenerateWorker(QThread):
         self.left_overlap = left_overlap
         self.right_overlap = right_overlap
         self.advance_extra = advance_extra
+        self.stats = GenerationStats()
 
     def run(self):
         try:
@@ -44,13 +94,14 @@ class GenerateWorker(QThread):
 
             def _cb(done: int, total: int):
                 self.progress.emit(done, total)
-            ini_path = generate_and_save(font_path=self.font_path, size_px=self.size, padding=self.padding, base_path=self.base, vertical=self.vertical, max_chars_per_page=self.max_chars_per_page, export_stroke_templates=self.export_stroke_templates, preset=self.preset, redir_modes=self.redir_modes, center_offset=self.center_offset, top_offset=self.top_offset, baseline_offset=self.baseline_offset, left_overlap=self.left_overlap, right_overlap=self.right_overlap, advance_extra=self.advance_extra)
+            ini_path = generate_and_save(font_path=self.font_path, size_px=self.size, padding=self.padding, base_path=self.base, vertical=self.vertical, max_chars_per_page=self.max_chars_per_page, export_stroke_templates=self.export_stroke_templates, preset=self.preset, redir_modes=self.redir_modes, center_offset=self.center_offset, top_offset=self.top_offset, baseline_offset=self.baseline_offset, left_overlap=self.left_overlap, right_overlap=self.right_overlap, advance_extra=self.advance_extra, glyph_cache=shared_glyph_cache(), progress_cb=_cb, stats=self.stats)
             self.finishedOk.emit(ini_path)
         except Exception as e:
             self.failed.emit(str(e))
 
 class PreviewPagesWorker(QThread):
-    finishedOk = Signal(object, object)
+    planned = Signal(object, int)
+    pageReady = Signal(int, object)
     failed = Signal(str)
     progress = Signal(int, int)
 
@@ -67,15 +118,47 @@ class PreviewPagesWorker(QThread):
         self.left_overlap = left_overlap
         self.right_overlap = right_overlap
         self.advance_extra = advance_extra
+        self._wanted: list[int] = [0, 1]
+        self._wanted_cond = threading.Condition()
+
+    def request_pages(self, indices: list[int]):
+        with self._wanted_cond:
+            self._wanted = list(indices)
+            self._wanted_cond.notify()
+
+    def requestInterruption(self):
+        super().requestInterruption()
+        with self._wanted_cond:
+            self._wanted_cond.notify()
+
+    def _next_wanted(self) -> int | None:
+        with self._wanted_cond:
+            if not self._wanted:
+                self._wanted_cond.wait(0.25)
+            if not self._wanted:
+                return None
+            return self._wanted.pop(0)
 
     def run(self):
         try:
 
             def _cb(d, t):
                 self.progress.emit(d, t)
-            from ..core.pages import safeGeneratePages as safe_generate_pages
-            metrics, pages = safe_generate_pages(font_path=self.font_path, size_px=self.size, padding=self.padding, save_dir=os.getcwd(), group_name='Preview', max_texture_size=4096, progress_cb=_cb, vertical=self.vertical, max_chars_per_page=self.max_chars_per_page, center_offset=self.center_offset, top_offset=self.top_offset, baseline_offset=self.baseline_offset, left_overlap=self.left_overlap, right_overlap=self.right_overlap, advance_extra=self.advance_extra, should_cancel=lambda: self.isInterruptionRequested())
-            self.finishedOk.emit(metrics, pages)
+            from ..core.pages import safePlanPages as safe_plan_pages, composePageCoverage as compose_page_coverage
+            should_cancel = lambda: self.isInterruptionRequested()
+            cps, table = (None, None)
+            try:
+                cps, table = preview_glyph_table(self.font_path, self.size, progress_cb=_cb, should_cancel=should_cancel)
+            except OSError:
+                pass
+            kwargs = dict(font_path=self.font_path, size_px=self.size, padding=self.padding, save_dir=os.getcwd(), group_name='Preview', codepoints=cps, max_texture_size=4096, progress_cb=_cb, vertical=self.vertical, max_chars_per_page=self.max_chars_per_page, center_offset=self.center_offset, top_offset=self.top_offset, baseline_offset=self.baseline_offset, left_overlap=self.left_overlap, right_overlap=self.right_overlap, advance_extra=self.advance_extra, should_cancel=should_cancel, glyph_cache=shared_glyph_cache(), glyph_table=table)
+            metrics, plan = safe_plan_pages(**kwargs)
+            self.planned.emit(metrics, len(plan.batches))
+            while not self.isInterruptionRequested():
+                index = self._next_wanted()
+                if index is None or not 0 <= index < len(plan.batches):
+                    continue
+                self.pageReady.emit(index, coverage_to_qimage(*compose_page_coverage(plan, index, should_cancel)))
         except Exception as e:
             self.failed.emit(str(e))
 
@@ -103,6 +186,7 @@ class MainWindow(FluentWindow):
         self.max_chars_per_page: int = 100
         self.export_stroke_templates: bool = False
         self.preset_mode: str | None = None
+        self._char_preview_cache: dict = {}
         self._init_text_icon_nav()
 
     class FontsWorker(QThread):
@@ -115,7 +199,7 @@ class MainWindow(FluentWindow):
 
                 def _cb(d, t):
                     self.progress.emit(d, t)
-                fonts = enumerate_font_variants_with_progress(_cb)
+                fonts = enumerate_font_variants_with_progress(_cb, cache_dir=user_cache_dir('fonts'), workers=0)
                 self.finishedOk.emit(fonts)
             except Exception as e:
                 self.failed.emit(str(e))
@@ -194,6 +278,7 @@ class MainWindow(FluentWindow):
         previewPanel.addLayout(ctrlRow)
         previewLabel = QLabel(dlg)
         previewLabel.setAlignment(Qt.AlignCenter)
+        previewLabel.setStyleSheet(PREVIEW_BACKGROUND_STYLE)
         scroll = QScrollArea(dlg)
         scroll.setWidget(previewLabel)
         scroll.setWidgetResizable(True)
@@ -327,7 +412,7 @@ class MainWindow(FluentWindow):
         fileBtn.clicked.connect(on_pick_file)
         preview_worker = {'worker': None}
         preview_state = {'cancelled': False}
-        current_pages = {'pix': [], 'index': 0}
+        current_pages = {'images': {}, 'index': 0, 'count': 0}
 
         def resolve_path_for_style(fam: str, style: str) -> Optional[str]:
             variants = getattr(self, 'font_variants', {}).get(fam) or {}
@@ -357,13 +442,17 @@ class MainWindow(FluentWindow):
                 preview_worker['worker'] = None
 
         def update_page_view():
-            if not current_pages['pix']:
+            if not current_pages['count']:
                 previewLabel.clear()
                 pageLabel.setText('0/0')
                 return
-            idx = max(0, min(current_pages['index'], len(current_pages['pix']) - 1))
-            previewLabel.setPixmap(current_pages['pix'][idx])
-            pageLabel.setText(f"{idx + 1}/{len(current_pages['pix'])}")
+            idx = max(0, min(current_pages['index'], current_pages['count'] - 1))
+            image = current_pages['images'].get(idx)
+            if image is None:
+                previewLabel.clear()
+            else:
+                previewLabel.setPixmap(image)
+            pageLabel.setText(f"{idx + 1}/{current_pages['count']}")
         debounce = QTimer(dlg)
         debounce.setSingleShot(True)
         debounce.setInterval(250)
@@ -379,8 +468,9 @@ class MainWindow(FluentWindow):
             bar.setValue(0)
             okBtn.setEnabled(False)
             previewLabel.clear()
-            current_pages['pix'] = []
+            current_pages['images'] = {}
             current_pages['index'] = 0
+            current_pages['count'] = 0
             cancel_preview_worker()
             preview_state['cancelled'] = False
             center_offset = int(getattr(self, 'applied_center_offset', 0))
@@ -394,39 +484,42 @@ class MainWindow(FluentWindow):
             def on_p(d, t):
                 bar.setValue(int(d * 100 / max(t, 1)))
 
-            def on_ok(metrics, pages):
-                tip.setText(self._t('dlg_preview_complete'))
+            def on_planned(metrics, count):
                 okBtn.setEnabled(True)
-                pix = []
-                for p in pages:
-                    bg = Image.new('RGBA', p.image.size, (40, 40, 40, 255))
-                    bg.alpha_composite(p.image)
-                    qimg = ImageQt(bg).copy()
-                    pix.append(QPixmap.fromImage(qimg))
-                current_pages['pix'] = pix
+                current_pages['images'] = {}
                 current_pages['index'] = 0
+                current_pages['count'] = count
                 update_page_view()
 
+            def on_page(index, image):
+                tip.setText(self._t('dlg_preview_complete'))
+                bar.setValue(100)
+                if accept_preview_page(current_pages, index, image):
+                    update_page_view()
+
             def on_fail(msg: str):
                 if preview_state.get('cancelled'):
                     return
                 tip.setText(self._t('dlg_preview_failed_prefix') + msg)
                 okBtn.setEnabled(False)
             w.progress.connect(on_p)
-            w.finishedOk.connect(on_ok)
+            w.planned.connect(on_planned)
+            w.pageReady.connect(on_page)
             w.failed.connect(on_fail)
             preview_worker['worker'] = w
             w.start()
         debounce.timeout.connect(start_preview_now)
 
         def go_prev():
-            if current_pages['pix']:
+            if current_pages['count']:
                 current_pages['index'] = max(0, current_pages['index'] - 1)
+                request_preview_pages(preview_worker['worker'], current_pages)
                 update_page_view()
 
         def go_next():
-            if current_pages['pix']:
-                current_pages['index'] = min(len(current_pages['pix']) - 1, current_pages['index'] + 1)
+            if current_pages['count']:
+                current_pages['index'] = min(current_pages['count'] - 1, current_pages['index'] + 1)
+                request_preview_pages(preview_worker['worker'], current_pages)
                 update_page_view()
         prevBtn.clicked.connect(go_prev)
         nextBtn.clicked.connect(go_next)
@@ -494,8 +587,15 @@ class MainWindow(FluentWindow):
         pct = int(done * 100 / max(total, 1))
         self.genBtn.setText(self._t('gen_generating_pct').format(pct=pct))
 
+    def _generation_summary(self, ini_path: str) -> str:
+        content = self._t('gen_success_saved').format(path=ini_path)
+        stats = getattr(self.worker, 'stats', None)
+        if stats is not None and stats.total_seconds > 0:
+            content += '\n' + format_stats(stats)
+        return content
+
     def _on_finished(self, ini_path: str):
-        InfoBar.success(title=self._t('gen_success_title'), content=self._t('gen_success_saved').format(path=ini_path), parent=self, duration=6000)
+        InfoBar.success(title=self._t('gen_success_title'), content=self._generation_summary(ini_path), parent=self, duration=10000)
         self.genBtn.setEnabled(True)
         self.genBtn.setText(self._t('generate_button'))
         self.worker = None
@@ -580,6 +680,7 @@ class MainWindow(FluentWindow):
         previewPanel.addLayout(ctrlRow)
         self.textPreviewLabel = QLabel(self.textIconPage)
         self.textPreviewLabel.setAlignment(Qt.AlignCenter)
+        self.textPreviewLabel.setStyleSheet(PREVIEW_BACKGROUND_STYLE)
         self.textScroll = QScrollArea(self.textIconPage)
         self.textScroll.setWidget(self.textPreviewLabel)
         self.textScroll.setWidgetResizable(True)
@@ -632,7 +733,7 @@ class MainWindow(FluentWindow):
         self.genProgress.setTextVisible(False)
         root.addWidget(self.genProgress)
         self._text_preview_worker = None
-        self._text_current_pages = {'pix': [], 'index': 0}
+        self._text_current_pages = {'images': {}, 'index': 0, 'count': 0}
 
         def render_list(filter_text: str=''):
             self.textListWidget.clear()
@@ -674,13 +775,17 @@ class MainWindow(FluentWindow):
                 self._text_preview_worker = None
 
         def update_page_view():
-            if not self._text_current_pages['pix']:
+            if not self._text_current_pages['count']:
                 self.textPreviewLabel.clear()
                 self.textPageLabel.setText('0/0')
                 return
-            idx = max(0, min(self._text_current_pages['index'], len(self._text_current_pages['pix']) - 1))
-            self.textPreviewLabel.setPixmap(self._text_current_pages['pix'][idx])
-            self.textPageLabel.setText(f"{idx + 1}/{len(self._text_current_pages['pix'])}")
+            idx = max(0, min(self._text_current_pages['index'], self._text_current_pages['count'] - 1))
+            image = self._text_current_pages['images'].get(idx)
+            if image is None:
+                self.textPreviewLabel.clear()
+            else:
+                self.textPreviewLabel.setPixmap(image)
+            self.textPageLabel.setText(f"{idx + 1}/{self._text_current_pages['count']}")
         text_debounce = QTimer(self.textIconPage)
         text_debounce.setSingleShot(True)
         text_debounce.setInterval(250)
@@ -694,8 +799,9 @@ class MainWindow(FluentWindow):
             if not self.selected_font_path:
                 return
             self.textPreviewLabel.clear()
-            self._text_current_pages['pix'] = []
+            self._text_current_pages['images'] = {}
             self._text_current_pages['index'] = 0
+            self._text_current_pages['count'] = 0
             cancel_preview_worker()
             self._text_preview_cancelled = False
             center_applied = int(getattr(self, 'applied_center_offset', 0))
@@ -706,17 +812,16 @@ class MainWindow(FluentWindow):
             adv_applied = int(getattr(self, 'applied_advance_extra', 0))
             w = PreviewPagesWorker(font_path=self.selected_font_path, size=int(self.textSizeSpin.value()), padding=int(self.textPaddingSpin.value()), vertical=bool(self.textVerticalChk.isChecked()), max_chars_per_page=int(self.textPerPageSpin.value()), center_offset=center_applied, top_offset=top_applied, baseline_offset=baseline_applied, left_overlap=left_applied, right_overlap=right_applied, advance_extra=adv_applied)
 
-            def on_ok(metrics, pages):
-                pix = []
-                for p in pages:
-                    bg = Image.new('RGBA', p.image.size, (40, 40, 40, 255))
-                    bg.alpha_composite(p.image)
-                    qimg = ImageQt(bg).copy()
-                    pix.append(QPixmap.fromImage(qimg))
-                self._text_current_pages['pix'] = pix
+            def on_planned(metrics, count):
+                self._text_current_pages['images'] = {}
                 self._text_current_pages['index'] = 0
+                self._text_current_pages['count'] = count
                 update_page_view()
 
+            def on_page(index, image):
+                if accept_preview_page(self._text_current_pages, index, image):
+                    update_page_view()
+
             def on_fail(msg: str):
                 if getattr(self, '_text_preview_cancelled', False):
                     return
@@ -741,7 +846,8 @@ class MainWindow(FluentWindow):
                     self.previewProgress.setValue(0)
                 except Exception:
                     pass
-            w.finishedOk.connect(lambda metrics, pages: (_finish_cleanup(), on_ok(metrics, pages)))
+            w.planned.connect(lambda metrics, count: (_finish_cleanup(), on_planned(metrics, count)))
+            w.pageReady.connect(on_page)
             w.failed.connect(lambda msg: (_finish_cleanup(), on_fail(msg)))
             self._text_preview_worker = w
             w.start()
@@ -858,14 +964,20 @@ class MainWindow(FluentWindow):
         self.textSearchEdit.textChanged.connect(lambda t: render_list(t))
 
         def go_prev():
-            if self._text_current_pages['pix']:
+            if self._text_current_pages['count']:
                 self._text_current_pages['index'] = max(0, self._text_current_pages['index'] - 1)
+                request_preview_pages(self._text_preview_worker, self._text_current_pages)
                 update_page_view()
 
         def go_next():
-            if self._text_current_pages['pix']:
-                self._text_current_pages['index'] = min(len(self._text_current_pages['pix']) - 1, self._text_current_pages['index'] + 1)
+            if self._text_current_pages['count']:
+                self._text_current_pages['index'] = min(self._text_current_pages['count'] - 1, self._text_current_pages['index'] + 1)
+                request_preview_pages(self._text_preview_worker, self._text_current_pages)
                 update_page_view()
+        try:
+            QApplication.instance().aboutToQuit.connect(cancel_preview_worker)
+        except Exception:
+            pass
         self.textPrevBtn.clicked.connect(go_prev)
         self.textNextBtn.clicked.connect(go_next)
         self.textPerPageSpin.valueChanged.connect(lambda _: schedule_preview())
@@ -907,7 +1019,7 @@ class MainWindow(FluentWindow):
             pass
 
     def _on_finished_text(self, ini_path: str):
-        InfoBar.success(title=self._t('gen_success_title'), content=self._t('gen_success_saved').format(path=ini_path), parent=self, duration=6000)
+        InfoBar.success(title=self._t('gen_success_title'), content=self._generation_summary(ini_path), parent=self, duration=10000)
         self.textGenBtn.setEnabled(True)
         self.textGenBtn.setText(self._t('generate_button'))
         self.worker = None
@@ -1130,6 +1242,36 @@ class MainWindow(FluentWindow):
         except Exception:
             pass
 
+    def _char_preview_glyph(self, ch: str, size_px: int, vertical: bool):
+        cache = self._char_preview_cache
+        key = (self.selected_font_path, size_px, ch, vertical)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+        font = load_font(self.selected_font_path, size_px)
+        baseline, top, _ = measure_font_metrics(font)
+        glyph = char_bitmap_to_rgba(render_char_bitmap(font, ch))
+        W = 70
+        H = 70
+        w_char, h_char = glyph.size
+        scale = min((W - 8) / max(w_char, 1), (H - 8) / max(h_char, 1), 1.0)
+        if scale < 1.0:
+            glyph = glyph.resize((max(1, int(round(w_char * scale))), max(1, int(round(h_char * scale)))), Image.LANCZOS)
+        if vertical:
+            glyph = glyph.rotate(90, expand=True)
+        w_char, h_char = glyph.size
+        x = (W - w_char) // 2
+        y = (H - h_char) // 2
+        base = Image.new('RGBA', (W, H), (0, 0, 0, 255))
+        glyph_white = Image.new('RGBA', glyph.size, (255, 255, 255, 255))
+        glyph_white.putalpha(glyph.getchannel('A'))
+        base.alpha_composite(glyph_white, (x, y))
+        entry = (base, baseline - top, scale, x, w_char)
+        if len(cache) >= 64:
+            cache.clear()
+        cache[key] = entry
+        return entry
+
     def _update_char_preview(self):
         try:
             from PIL import ImageDraw
@@ -1140,12 +1282,8 @@ class MainWindow(FluentWindow):
             if len(ch) > 1:
                 ch = ch[0]
             size_px = int(self.textSizeSpin.value())
-            font = load_font(self.selected_font_path, size_px)
-            baseline, top, _ = measure_font_metrics(font)
-            cb = render_char_bitmap(font, ch)
-            glyph = cb.image
-            W = 70
-            H = 70
+            base, ascend, scale, x, w_char = self._char_preview_glyph(ch, size_px, bool(self.textVerticalChk.isChecked()))
+            W, H = base.size
             base_y = H // 2
             center_offset = int(self.center_spin.value()) if hasattr(self, 'center_spin') else 0
             top_offset = int(self.top_spin.value()) if hasattr(self, 'top_spin') else 0
@@ -1153,45 +1291,19 @@ class MainWindow(FluentWindow):
             left_overlap = int(self.left_overlap_spin.value()) if hasattr(self, 'left_overlap_spin') else 0
             right_overlap = int(self.right_overlap_spin.value()) if hasattr(self, 'right_overlap_spin') else 0
             advance_extra = int(self.advance_extra_spin.value()) if hasattr(self, 'advance_extra_spin') else 0
-            ascend = baseline - top
             try:
                 padding_px = int(self.textPaddingSpin.value())
             except Exception:
                 padding_px = 0
             top_padding = int(padding_px / 2)
-            w_char, h_char = glyph.size
-            scale = min((W - 8) / max(w_char, 1), (H - 8) / max(h_char, 1), 1.0)
-            if scale < 1.0:
-                from PIL import Image as _PIL_Image
-                glyph = glyph.resize((max(1, int(round(w_char * scale))), max(1, int(round(h_char * scale)))), _PIL_Image.LANCZOS)
-                w_char, h_char = glyph.size
             ascend_scaled = int(round(ascend * scale))
             top_padding_scaled = int(round(top_padding * scale))
-            if bool(self.textVerticalChk.isChecked()):
-                glyph = glyph.rotate(90, expand=True)
-                w_char, h_char = glyph.size
-            w_char, h_char = glyph.size
-            x = (W - w_char) // 2
-            y = (H - h_char) // 2
             half_asc = max(0, int(round(ascend_scaled / 2)))
             center_line_y = base_y + top_padding_scaled - center_offset
             top_line_y = center_line_y - half_asc - top_offset
             baseline_line_y = center_line_y + half_asc - baseline_offset
-            img = Image.new('RGBA', (W, H), (0, 0, 0, 255))
+            img = base.copy()
             draw = ImageDraw.Draw(img)
-            try:
-                if glyph.mode in ('RGBA', 'LA'):
-                    mask = glyph.split()[3] if glyph.mode == 'RGBA' else glyph.split()[1]
-                else:
-                    mask = None
-                if mask is not None:
-                    glyph_white = Image.new('RGBA', glyph.size, (255, 255, 255, 255))
-                    glyph_white.putalpha(mask)
-                    img.alpha_composite(glyph_white, (x, y))
-                else:
-                    draw.text((x, y), ch, font=font, fill=(255, 255, 255, 255))
-            except Exception:
-                img.alpha_composite(glyph, (x, y))
             bly = min(H - 1, max(0, int(baseline_line_y)))
             tly = min(H - 1, max(0, int(top_line_y)))
             draw.line([(4, bly), (W - 4, bly)], fill=(255, 64, 64, 255), width=1)
@@ -1220,12 +1332,7 @@ class MainWindow(FluentWindow):
             if adv_scaled > 0:
                 rect_x1 = min(W - 1, max(0, right_line_x))
                 rect_x2 = min(W - 1, max(0, right_line_x + adv_scaled))
-                rx1 = min(rect_x1, rect_x2)
-                rx2 = max(rect_x1, rect_x2)
-                top_y = min(y1, y2)
-                bot_y = max(y1, y2)
-                for xx in range(rx1, rx2 + 1):
-                    draw.line([(xx, top_y), (xx, bot_y)], fill=(255, 0, 255, 128), width=1)
+                img.paste((255, 0, 255, 128), (min(rect_x1, rect_x2), min(y1, y2), max(rect_x1, rect_x2) + 1, max(y1, y2) + 1))
             qimg = ImageQt(img).copy()
             self.charPreviewLabel.setPixmap(QPixmap.fromImage(qimg))
         except Exception as e:
@@ -1,7 +1,15 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional, List, Callable
+from typing import Dict, Optional, List, Callable
+
+
+@dataclass
+class PngOptions:
+    compress_level: Optional[int] = None
+    strategy: Optional[str] = None
+    optimize: bool = False
+    workers: int = 0
 
 
 @dataclass
@@ -24,5 +32,14 @@ class GenerateConfig:
     left_overlap: int = 0
     right_overlap: int = 0
     advance_extra: int = 0
+    workers: int = 1
+    export_stroke_templates: bool = False
+    write_redir_files: bool = True
+    redir_modes: Optional[Dict[str, str]] = None
+    page_mode: str = "RGBA"
+    png_options: Optional[PngOptions] = None
+    incremental: bool = True
+    profile: Optional[str] = None
+    max_memory_mb: Optional[float] = None
     progress_cb: Optional[Callable[[int, int], None]] = None
-    should_cancel: Optional[Callable[[], bool]] = None
\ No newline at end of file
+    should_cancel: Optional[Callable[[], bool]] = None
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
 from PIL import Image
 
+from .config import GenerateConfig
+
 
 @dataclass
 class FontMetrics:
@@ -20,10 +22,14 @@ class FontMetrics:
 @dataclass
 class CharBitmap:
     codepoint: int
-    image: Image.Image
+    mask: Image.Image
     width_adv: int
     bbox_w: int
     bbox_h: int
+    ink_w: int = 1
+    ink_h: int = 1
+    offset_x: int = 0
+    offset_y: int = 0
 
 
 @dataclass
@@ -33,6 +39,48 @@ class PageLayout:
     num_rows: int
     frame_w: int
     frame_h: int
-    image: Image.Image
+    image: Optional[Image.Image]
     lines: List[str]
-    widths: List[int]
\ No newline at end of file
+    widths: List[int]
+
+
+@dataclass
+class PagePlan:
+    page_names: List[str]
+    batches: List[List[int]]
+    num_cols: int
+    fixed_rows: Optional[int]
+    frame_w: int
+    frame_h: int
+    padding: int
+    vertical: bool
+    center_offset: int
+    baseline_offset: int
+    glyphs: Dict[int, CharBitmap]
+
+
+@dataclass
+class GenerationStats:
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+    glyphs: int = 0
+    empty_glyphs: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    pages: List[Tuple[int, int]] = field(default_factory=list)
+    pages_reused: int = 0
+    files_written: int = 0
+    bytes_written: int = 0
+    total_seconds: float = 0.0
+    peak_rss_mb: float = 0.0
+    stage_peak_mb: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class BatchResult:
+    config: GenerateConfig
+    base_path: str
+    ini_path: Optional[str] = None
+    seconds: float = 0.0
+    error: Optional[str] = None
+    duplicate_of: Optional[int] = None
+    stats: Optional[GenerationStats] = None